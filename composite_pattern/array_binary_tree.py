@@ -0,0 +1,334 @@
+"""
+ArrayBinaryTree - Implicit, array-backed binary tree (requires NumPy)
+Stores a binary tree as one contiguous NumPy value array in heap order
+instead of one Python object per node.
+
+Node i has children 2i+1 and 2i+2 and parent (i-1)//2, so links take no
+memory at all. A boolean presence mask marks which slots hold nodes, which
+allows near-complete trees; the mask must be closed under parents.
+
+Aggregates are vectorized over the whole array (count, sum, height) or
+computed one level at a time, each level being the contiguous slice
+2**d - 1 .. 2**(d+1) - 2. Traversal orders are derived arithmetically
+from each slot's position in the perfect tree of the same height, so no
+Python-level walk is needed. ArrayBinaryTree implements the TreeNode
+interface and converts to and from BinaryNode/LeafNode trees.
+
+Usage: python array_binary_tree.py [node counts...] [--max-object-nodes N]
+Object trees above N nodes (default 10^7) are not built for comparison.
+"""
+
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from binary_tree_composite import BinaryNode, LeafNode, TreeNode
+
+
+class ArrayBinaryTree(TreeNode):
+    """Binary tree in heap layout: values[i] with children at 2i+1 and 2i+2"""
+
+    # Iterators convert this many values at a time to Python objects
+    CHUNK = 1 << 16
+
+    def __init__(self, values: np.ndarray, present: Optional[np.ndarray] = None):
+        """
+        values:  value of each slot (absent slots are ignored)
+        present: bool mask of occupied slots; all slots if None
+        """
+        self.values = np.asarray(values)
+        n = len(self.values)
+        if n == 0:
+            raise ValueError("ArrayBinaryTree needs at least a root node")
+        self.present = (np.ones(n, dtype=np.bool_) if present is None
+                        else np.asarray(present, dtype=np.bool_))
+        if len(self.present) != n:
+            raise ValueError("values and present must have the same length")
+        if not self.present[0]:
+            raise ValueError("the root slot must be present")
+        if n > 1 and np.any(self.present[1:] & ~self.present[(np.arange(1, n) - 1) // 2]):
+            raise ValueError("every present slot needs a present parent")
+        super().__init__(self.values[0].item())
+        self._count: Optional[int] = None
+
+    @classmethod
+    def from_node(cls, root: TreeNode, max_slots: int = 1 << 28) -> 'ArrayBinaryTree':
+        """
+        Copy a BinaryNode/LeafNode tree into heap layout
+
+        The array needs 2**(height + 1) - 1 slots at most, so sparse or
+        skewed trees are rejected once they would exceed `max_slots`.
+        """
+        indices: List[int] = []
+        values: list = []
+        queue = deque([(root, 0)])
+        while queue:
+            node, index = queue.popleft()
+            if index >= max_slots:
+                raise ValueError(f"tree needs more than {max_slots:,} slots in heap layout")
+            indices.append(index)
+            values.append(node.value)
+            if node.left is not None:
+                queue.append((node.left, 2 * index + 1))
+            if node.right is not None:
+                queue.append((node.right, 2 * index + 2))
+        n = max(indices) + 1
+        filled = np.array(values)
+        slots = np.zeros(n, dtype=filled.dtype)
+        present = np.zeros(n, dtype=np.bool_)
+        slots[indices] = filled
+        present[indices] = True
+        return cls(slots, present)
+
+    def to_node(self) -> TreeNode:
+        """Build the equivalent BinaryNode/LeafNode tree (deepest slots first)"""
+        n = len(self.values)
+        nodes: List[Optional[TreeNode]] = [None] * n
+        values = self.values.tolist()
+        for i in np.flatnonzero(self.present)[::-1].tolist():
+            left = nodes[2 * i + 1] if 2 * i + 1 < n else None
+            right = nodes[2 * i + 2] if 2 * i + 2 < n else None
+            if left is None and right is None:
+                nodes[i] = LeafNode(values[i])
+                continue
+            node = BinaryNode(values[i])
+            node.set_left(left)
+            node.set_right(right)
+            nodes[i] = node
+        return nodes[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.present.nbytes
+
+    def __len__(self) -> int:
+        return self.count_nodes()
+
+    # TreeNode operations -----------------------------------------------------
+
+    def count_nodes(self) -> int:
+        if self._count is None:
+            self._count = int(np.count_nonzero(self.present))
+        return self._count
+
+    def sum_values(self):
+        return self.values[self.present].sum().item()
+
+    def get_height(self) -> int:
+        """Depth of the deepest present slot"""
+        last = int(np.flatnonzero(self.present)[-1])
+        return (last + 1).bit_length() - 1
+
+    def display(self, prefix: str = "", is_tail: bool = True) -> str:
+        """Box-drawing diagram (builds the object tree, so meant for small trees)"""
+        return self.to_node().display(prefix, is_tail)
+
+    def iter_display(self, **options) -> Iterator[str]:
+        """Streamed diagram of the object tree (see TreeNode.iter_display)"""
+        return self.to_node().iter_display(**options)
+
+    def inorder(self) -> list:
+        return self.values[self.inorder_indices()].tolist()
+
+    def preorder(self) -> list:
+        return self.values[self.preorder_indices()].tolist()
+
+    def postorder(self) -> list:
+        return self.values[self.postorder_indices()].tolist()
+
+    def levelorder(self) -> list:
+        return self.values[self.present].tolist()
+
+    def iter_inorder(self) -> Iterator:
+        return self._iterate(self.values[self.inorder_indices()])
+
+    def iter_preorder(self) -> Iterator:
+        return self._iterate(self.values[self.preorder_indices()])
+
+    def iter_postorder(self) -> Iterator:
+        return self._iterate(self.values[self.postorder_indices()])
+
+    def iter_levelorder(self) -> Iterator:
+        return self._iterate(self.values[self.present])
+
+    # Array-level operations --------------------------------------------------
+
+    def level(self, depth: int) -> np.ndarray:
+        """Values of the present slots at one depth, left to right"""
+        start, stop = (1 << depth) - 1, min((1 << (depth + 1)) - 1, len(self.values))
+        return self.values[start:stop][self.present[start:stop]]
+
+    def subtree_sums(self) -> np.ndarray:
+        """Sum of every slot's subtree (0 for absent slots), one level at a time"""
+        sums = np.where(self.present, self.values, 0)
+        return self._accumulate(sums)
+
+    def subtree_counts(self) -> np.ndarray:
+        """Node count of every slot's subtree, one level at a time"""
+        return self._accumulate(self.present.astype(np.int64))
+
+    def inorder_indices(self) -> np.ndarray:
+        """Slot indices of the present nodes in inorder"""
+        return self._order_by(self._inorder_keys())
+
+    def preorder_indices(self) -> np.ndarray:
+        """Slot indices of the present nodes in preorder"""
+        return self._order_by(self._perfect_ranks(post=False))
+
+    def postorder_indices(self) -> np.ndarray:
+        """Slot indices of the present nodes in postorder"""
+        return self._order_by(self._perfect_ranks(post=True))
+
+    def _accumulate(self, totals: np.ndarray) -> np.ndarray:
+        """Add each level's children into their parents, deepest level first"""
+        n = len(totals)
+        for depth in range(self.get_height() - 1, -1, -1):
+            start, stop = (1 << depth) - 1, (1 << (depth + 1)) - 1
+            for offset in (1, 2):
+                first = 2 * start + offset
+                if first >= n:
+                    continue
+                children = totals[first:min(2 * stop + offset, n):2]
+                totals[start:start + len(children)] += children
+        return totals
+
+    def _depths(self) -> np.ndarray:
+        """Depth of every slot: floor(log2(i + 1)), exact below 2**53 slots"""
+        _, exponents = np.frexp(np.arange(1, len(self.values) + 1, dtype=np.float64))
+        return exponents.astype(np.int64) - 1
+
+    def _inorder_keys(self) -> np.ndarray:
+        """Inorder rank of every slot within the perfect tree of the same height"""
+        height = self.get_height()
+        index = np.arange(len(self.values), dtype=np.int64)
+        depths = self._depths()
+        position = index + 1 - (np.int64(1) << depths)
+        return ((2 * position + 1) << (height - depths)) - 1
+
+    def _perfect_ranks(self, post: bool) -> np.ndarray:
+        """Preorder (or postorder) rank of every slot in the perfect tree, level by level"""
+        height = self.get_height()
+        n = len(self.values)
+        first = np.zeros(n, dtype=np.int64)  # Preorder rank of the slot / first rank of its subtree
+        for depth in range(height):
+            start, stop = (1 << depth) - 1, min((1 << (depth + 1)) - 1, n)
+            child_subtree = (1 << (height - depth)) - 1  # Slots in each child's perfect subtree
+            parents = first[start:stop]
+            for offset in (1, 2):
+                lo = 2 * start + offset
+                if lo >= n:
+                    continue
+                hi = min(2 * stop + offset, n)
+                count = len(range(lo, hi, 2))
+                if post:
+                    # Postorder: a subtree's ranks start where its parent's do,
+                    # the right subtree after the whole left one
+                    first[lo:hi:2] = parents[:count] + (0 if offset == 1 else child_subtree)
+                else:
+                    first[lo:hi:2] = parents[:count] + 1 + (0 if offset == 1 else child_subtree)
+        if not post:
+            return first
+        depths = self._depths()
+        return first + (np.int64(1) << (height - depths + 1)) - 2
+
+    def _order_by(self, keys: np.ndarray) -> np.ndarray:
+        present = np.flatnonzero(self.present)
+        return present[np.argsort(keys[present], kind="stable")]
+
+    def _iterate(self, values: np.ndarray) -> Iterator:
+        for start in range(0, len(values), self.CHUNK):
+            yield from values[start:start + self.CHUNK].tolist()
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def benchmark(n: int, max_object_nodes: int, bytes_per_object_node: list,
+              max_traced_nodes: int = 2_000_000) -> None:
+    """
+    Compare aggregates and traversals on a complete tree of n nodes
+
+    Object trees above max_traced_nodes are built without tracemalloc
+    (whose own bookkeeping would not fit in memory); their memory is
+    extrapolated from the largest traced size.
+    """
+    print(f"{n:,} nodes (complete tree)")
+    rng = np.random.default_rng(0)
+    tree, build_time = _timed(lambda: ArrayBinaryTree(rng.integers(0, 1000, size=n)))
+    operations = [
+        ("count", lambda t: t.count_nodes()),
+        ("sum", lambda t: t.sum_values()),
+        ("height", lambda t: t.get_height()),
+        ("inorder", lambda t: t.inorder()),
+        ("levelorder", lambda t: list(t.iter_levelorder())),
+    ]
+    array_times = {}
+    for name, operation in operations:
+        tree._count = None
+        _, array_times[name] = _timed(lambda: operation(tree))
+    print(f"   Array    {tree.nbytes / n:7.1f} B/node  {tree.nbytes / 2**20:9.1f} MiB   (build {build_time:.2f} s)")
+
+    if n > max_object_nodes:
+        if bytes_per_object_node:
+            estimate = bytes_per_object_node[-1] * n
+            print(f"   Objects  {bytes_per_object_node[-1]:7.1f} B/node  "
+                  f"{estimate / 2**20:9.1f} MiB   (extrapolated, not built)")
+        for name, _ in operations:
+            print(f"   {name:11} array {array_times[name] * 1e3:9.1f} ms")
+        print()
+        return
+
+    if n <= max_traced_nodes:
+        tracemalloc.start()
+        root, convert_time = _timed(tree.to_node)
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        bytes_per_object_node.append(used / n)
+        note = ""
+    else:
+        root, convert_time = _timed(tree.to_node)
+        used = bytes_per_object_node[-1] * n if bytes_per_object_node else 0
+        note = ", memory extrapolated"
+    print(f"   Objects  {used / n:7.1f} B/node  {used / 2**20:9.1f} MiB   "
+          f"(to_node {convert_time:.2f} s{note})   memory ratio {used / tree.nbytes:.1f}x")
+    for name, operation in operations:
+        result, object_time = _timed(lambda: operation(root))
+        assert result == operation(tree)
+        print(f"   {name:11} array {array_times[name] * 1e3:9.1f} ms   objects {object_time * 1e3:9.1f} ms"
+              f"   ({object_time / array_times[name]:,.1f}x)")
+    print()
+
+
+def main():
+    """Compare ArrayBinaryTree and BinaryNode trees up to 10^7 nodes"""
+    args = sys.argv[1:]
+    max_object_nodes = 10_000_000
+    if "--max-object-nodes" in args:
+        position = args.index("--max-object-nodes")
+        max_object_nodes = int(args[position + 1])
+        del args[position:position + 2]
+    sizes = [int(arg) for arg in args] or [10**6, 10**7]
+
+    print("=" * 80)
+    print("BINARY TREE COMPOSITE - ARRAY-BACKED VS OBJECT TREE")
+    print("=" * 80)
+    print()
+    small = ArrayBinaryTree(np.array([10, 5, 15, 3, 7, 0, 20]),
+                            np.array([True, True, True, True, True, False, True]))
+    print(small.display())
+    print(f"inorder {small.inorder()}, subtree sums {small.subtree_sums().tolist()}")
+    print()
+    bytes_per_object_node: list = []
+    for n in sizes:
+        benchmark(n, max_object_nodes, bytes_per_object_node)
+
+
+if __name__ == "__main__":
+    main()
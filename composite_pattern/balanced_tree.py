@@ -0,0 +1,548 @@
+"""
+Balanced Search Tree built on the Binary Tree Composite
+An AVL tree whose nodes are BinaryNodes, so display(), the traversals and
+the other TreeNode operations work on it unchanged.
+
+Every node caches its height, and insert/delete rebalance the nodes on
+the search path with single or double rotations. The tree height stays
+below 1.45 log2(n), so insert, delete, contains, floor and ceiling are
+O(log n). Nodes are linked only through set_left/set_right.
+
+    tree = AVLTree([50, 20, 80])
+    tree.insert(65)
+    tree.floor(70)      # 65
+    print(tree.display())
+
+OrderStatisticTree uses AugmentedNodes, which also cache the count, sum,
+min and max of their subtree. set_left/set_right and the rotations keep
+those caches current, which makes kth_smallest, rank, range_count and
+range_sum O(log n) as well.
+"""
+
+import bisect
+import random
+import sys
+import time
+from typing import Any, Iterable, Iterator, List, Optional
+
+from binary_tree_composite import BinaryNode
+
+
+class AVLNode(BinaryNode):
+    """BinaryNode that caches the height of its subtree"""
+
+    def __init__(self, value):
+        super().__init__(value)
+        self._height = 0
+
+    def get_height(self) -> int:
+        """Height of this subtree in O(1)"""
+        return self._height
+
+    def _refresh(self) -> None:
+        """Recompute the cached fields from the children, which must be current"""
+        self._height = 1 + max(_height(self.left), _height(self.right))
+
+
+class AugmentedNode(AVLNode):
+    """
+    AVLNode that also caches its subtree's node count, sum, min and max
+
+    set_left/set_right refresh the node's own summary from its children, so
+    a tree linked bottom-up stays correct; AVLTree refreshes every node on
+    a changed path. Children must be AugmentedNodes as well.
+    """
+
+    def __init__(self, value):
+        super().__init__(value)
+        self._count = 1
+        self._sum = value
+        self._min = value
+        self._max = value
+
+    def set_left(self, node: Optional['AugmentedNode']) -> None:
+        self.left = node
+        self._refresh()
+
+    def set_right(self, node: Optional['AugmentedNode']) -> None:
+        self.right = node
+        self._refresh()
+
+    def count_nodes(self) -> int:
+        """Nodes in this subtree in O(1)"""
+        return self._count
+
+    def sum_values(self) -> int:
+        """Sum of this subtree's values in O(1)"""
+        return self._sum
+
+    def get_min(self):
+        """Smallest value in this subtree in O(1)"""
+        return self._min
+
+    def get_max(self):
+        """Largest value in this subtree in O(1)"""
+        return self._max
+
+    def _refresh(self) -> None:
+        value = self.value
+        count, total, low, high, height = 1, value, value, value, 0
+        left, right = self.left, self.right
+        if left is not None:
+            count += left._count
+            total += left._sum
+            if left._min < low:
+                low = left._min
+            if left._max > high:
+                high = left._max
+            height = left._height + 1
+        if right is not None:
+            count += right._count
+            total += right._sum
+            if right._min < low:
+                low = right._min
+            if right._max > high:
+                high = right._max
+            if right._height >= height:
+                height = right._height + 1
+        self._count, self._sum, self._min, self._max, self._height = count, total, low, high, height
+
+
+def _height(node: Optional[AVLNode]) -> int:
+    return node._height if node is not None else -1
+
+
+def _count(node: Optional[AugmentedNode]) -> int:
+    return node._count if node is not None else 0
+
+
+def _sum(node: Optional[AugmentedNode]):
+    return node._sum if node is not None else 0
+
+
+def _rotate_right(node: AVLNode) -> AVLNode:
+    pivot = node.left
+    node.set_left(pivot.right)
+    pivot.set_right(node)
+    node._refresh()
+    pivot._refresh()
+    return pivot
+
+
+def _rotate_left(node: AVLNode) -> AVLNode:
+    pivot = node.right
+    node.set_right(pivot.left)
+    pivot.set_left(node)
+    node._refresh()
+    pivot._refresh()
+    return pivot
+
+
+def _rebalance(node: AVLNode) -> AVLNode:
+    """Restore the AVL invariant at `node`; returns the subtree's new root"""
+    node._refresh()
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.set_left(_rotate_left(node.left))
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.set_right(_rotate_right(node.right))
+        return _rotate_left(node)
+    return node
+
+
+class AVLTree:
+    """Sorted set of comparable keys stored in a self-balancing BinaryNode tree"""
+
+    NODE = AVLNode
+    # Whether every node on a changed path caches something that must be
+    # refreshed, or retracing may stop once a subtree's height is unchanged
+    FULL_RETRACE = False
+
+    def __init__(self, keys: Iterable = ()):
+        self.root: Optional[AVLNode] = None
+        self._size = 0
+        self.insert_all(keys)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: Any) -> bool:
+        return self.contains(key)
+
+    def __iter__(self) -> Iterator:
+        """Keys in ascending order"""
+        return self.root.iter_inorder() if self.root is not None else iter(())
+
+    def contains(self, key: Any) -> bool:
+        """O(log n) membership test"""
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return True
+            node = node.left if key < node.value else node.right
+        return False
+
+    def insert(self, key: Any) -> bool:
+        """Add a key in O(log n); returns False if it was already present"""
+        path: List[AVLNode] = []
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return False
+            path.append(node)
+            node = node.left if key < node.value else node.right
+        leaf = self.NODE(key)
+        if not path:
+            self.root = leaf
+        elif key < path[-1].value:
+            path[-1].set_left(leaf)
+        else:
+            path[-1].set_right(leaf)
+        self._size += 1
+        self._retrace(path)
+        return True
+
+    def delete(self, key: Any) -> None:
+        """Remove a key in O(log n); raises KeyError if it is absent"""
+        path: List[AVLNode] = []
+        node = self.root
+        while node is not None and key != node.value:
+            path.append(node)
+            node = node.left if key < node.value else node.right
+        if node is None:
+            raise KeyError(key)
+
+        if node.left is not None and node.right is not None:
+            # Move the in-order successor's key here and unlink the successor
+            path.append(node)
+            successor = node.right
+            while successor.left is not None:
+                path.append(successor)
+                successor = successor.left
+            node.value = successor.value
+            node = successor
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self.root = child
+        elif path[-1].left is node:
+            path[-1].set_left(child)
+        else:
+            path[-1].set_right(child)
+        self._size -= 1
+        self._retrace(path)
+
+    def discard(self, key: Any) -> bool:
+        """Remove a key if present; returns whether it was"""
+        try:
+            self.delete(key)
+        except KeyError:
+            return False
+        return True
+
+    def floor(self, key: Any) -> Any:
+        """Largest key <= `key`, or None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return node.value
+            if key < node.value:
+                node = node.left
+            else:
+                best = node.value
+                node = node.right
+        return best
+
+    def ceiling(self, key: Any) -> Any:
+        """Smallest key >= `key`, or None"""
+        best = None
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return node.value
+            if key > node.value:
+                node = node.right
+            else:
+                best = node.value
+                node = node.left
+        return best
+
+    def min(self) -> Any:
+        """Smallest key; raises ValueError on an empty tree"""
+        if self.root is None:
+            raise ValueError("min() of an empty tree")
+        node = self.root
+        while node.left is not None:
+            node = node.left
+        return node.value
+
+    def max(self) -> Any:
+        """Largest key; raises ValueError on an empty tree"""
+        if self.root is None:
+            raise ValueError("max() of an empty tree")
+        node = self.root
+        while node.right is not None:
+            node = node.right
+        return node.value
+
+    def insert_all(self, keys: Iterable) -> int:
+        """
+        Add many keys; returns how many were new
+
+        Small batches are inserted one by one, O(m log(n + m)). A batch at
+        least as large as the tree is merged with the existing keys and the
+        tree is rebuilt perfectly balanced, O(n + m log m).
+        """
+        keys = list(keys)
+        if len(keys) < max(16, self._size):
+            return sum(self.insert(key) for key in keys)
+        merged = sorted(set(keys).union(self))
+        added = len(merged) - self._size
+        self.root = self._build_balanced(merged)
+        self._size = len(merged)
+        return added
+
+    def height(self) -> int:
+        """Height of the tree (-1 when empty), in O(1)"""
+        return _height(self.root)
+
+    def display(self) -> str:
+        return self.root.display() if self.root is not None else "∅"
+
+    def _build_balanced(self, keys: List) -> Optional[AVLNode]:
+        """Perfectly balanced tree over sorted, distinct keys in O(n)"""
+        if not keys:
+            return None
+        nodes = [self.NODE(key) for key in keys]
+        # Link bottom-up: each range's middle node becomes its subtree root
+        stack = [(0, len(keys), None, False)]
+        order = []
+        while stack:
+            lo, hi, parent, is_left = stack.pop()
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            if parent is not None:
+                (parent.set_left if is_left else parent.set_right)(node)
+            order.append(node)
+            if lo < mid:
+                stack.append((lo, mid, node, True))
+            if mid + 1 < hi:
+                stack.append((mid + 1, hi, node, False))
+        for node in reversed(order):
+            node._refresh()
+        return nodes[len(keys) // 2]
+
+    def _retrace(self, path: List[AVLNode]) -> None:
+        """Rebalance the nodes on a search path, deepest first"""
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node._height
+            subtree = _rebalance(node)
+            if subtree is node:
+                pass  # Parent link unchanged; the parent is refreshed next
+            elif i == 0:
+                self.root = subtree
+            elif path[i - 1].left is node:
+                path[i - 1].set_left(subtree)
+            else:
+                path[i - 1].set_right(subtree)
+            if subtree is node and node._height == old_height and not self.FULL_RETRACE:
+                break  # Nothing above this point changed
+
+
+class OrderStatisticTree(AVLTree):
+    """AVLTree of AugmentedNodes with O(log n) rank and range queries"""
+
+    NODE = AugmentedNode
+    FULL_RETRACE = True
+
+    def kth_smallest(self, k: int):
+        """The k-th smallest key (k = 1 is the minimum); raises IndexError"""
+        if not 1 <= k <= self._size:
+            raise IndexError(f"k must be between 1 and {self._size}")
+        node = self.root
+        while True:
+            left_count = _count(node.left)
+            if k <= left_count:
+                node = node.left
+            elif k == left_count + 1:
+                return node.value
+            else:
+                k -= left_count + 1
+                node = node.right
+
+    def rank(self, key) -> int:
+        """Number of keys smaller than `key`"""
+        return self._below(key, False)[0]
+
+    def range_count(self, lo, hi) -> int:
+        """Number of keys with lo <= key <= hi"""
+        if hi < lo:
+            return 0
+        return self._below(hi, True)[0] - self._below(lo, False)[0]
+
+    def range_sum(self, lo, hi):
+        """Sum of the keys with lo <= key <= hi"""
+        if hi < lo:
+            return 0
+        return self._below(hi, True)[1] - self._below(lo, False)[1]
+
+    def _below(self, key, inclusive: bool) -> tuple:
+        """(count, sum) of keys < key (or <= key when inclusive)"""
+        count = 0
+        total = 0
+        node = self.root
+        while node is not None:
+            if node.value < key or (inclusive and node.value == key):
+                count += _count(node.left) + 1
+                total += _sum(node.left) + node.value
+                node = node.right
+            else:
+                node = node.left
+        return count, total
+
+
+def _check(tree: AVLTree) -> None:
+    """Assert the BST order, cached heights and AVL balance of every node"""
+    keys = list(tree)
+    assert keys == sorted(set(keys)) and len(keys) == len(tree)
+    stack = [tree.root] if tree.root is not None else []
+    while stack:
+        node = stack.pop()
+        assert node._height == 1 + max(_height(node.left), _height(node.right))
+        if isinstance(node, AugmentedNode):
+            assert node._count == 1 + _count(node.left) + _count(node.right)
+            assert node._sum == node.value + _sum(node.left) + _sum(node.right)
+        assert abs(_height(node.left) - _height(node.right)) <= 1
+        stack.extend(child for child in (node.left, node.right) if child is not None)
+
+
+def main():
+    """Benchmark the AVL tree against a bisect-sorted list and a dict"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+
+    print("=" * 70)
+    print("BINARY TREE COMPOSITE - AVL SEARCH TREE")
+    print("=" * 70)
+    print()
+
+    small = AVLTree([50, 20, 80, 10, 30, 65, 90])
+    small.insert(25)
+    small.delete(80)
+    _check(small)
+    print(small.display())
+    print(f"floor(64) = {small.floor(64)}, ceiling(26) = {small.ceiling(26)}, "
+          f"height = {small.height()}")
+    print()
+
+    rng = random.Random(7)
+    keys = rng.sample(range(n * 10), n)
+    queries = [rng.randrange(n * 10) for _ in range(operations)]
+    present = set(keys)
+    fresh = [key for key in rng.sample(range(n * 10), 2 * operations) if key not in present]
+    fresh = fresh[:operations]  # New keys spread over the whole key range
+    victims = rng.sample(keys, operations)
+
+    def timed(func) -> float:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    tree = AVLTree()
+    results = {"AVLTree": [timed(lambda: tree.insert_all(keys))]}
+    sorted_keys: List[int] = []
+    results["sorted list"] = [timed(lambda: sorted_keys.extend(sorted(keys)))]
+    table = {}
+    results["dict"] = [timed(lambda: table.update(dict.fromkeys(keys)))]
+
+    def sorted_contains(key):
+        i = bisect.bisect_left(sorted_keys, key)
+        return i < len(sorted_keys) and sorted_keys[i] == key
+
+    def sorted_floor(key):
+        i = bisect.bisect_right(sorted_keys, key)
+        return sorted_keys[i - 1] if i else None
+
+    def sorted_delete(key):
+        del sorted_keys[bisect.bisect_left(sorted_keys, key)]
+
+    results["AVLTree"] += [
+        timed(lambda: [tree.insert(key) for key in fresh]),
+        timed(lambda: [key in tree for key in queries]),
+        timed(lambda: [tree.floor(key) for key in queries]),
+        timed(lambda: [tree.delete(key) for key in victims]),
+    ]
+    results["sorted list"] += [
+        timed(lambda: [bisect.insort(sorted_keys, key) for key in fresh]),
+        timed(lambda: [sorted_contains(key) for key in queries]),
+        timed(lambda: [sorted_floor(key) for key in queries]),
+        timed(lambda: [sorted_delete(key) for key in victims]),
+    ]
+    results["dict"] += [
+        timed(lambda: [table.__setitem__(key, None) for key in fresh]),
+        timed(lambda: [key in table for key in queries]),
+        None,
+        timed(lambda: [table.__delitem__(key) for key in victims]),
+    ]
+    assert list(tree) == sorted_keys and len(tree) == len(table)
+    print(f"{n:,} keys, then {operations:,} of each point operation "
+          f"(AVL height {tree.height()})")
+    print()
+    columns = ["bulk load", "insert", "contains", "floor", "delete"]
+    print(f"{'':12}" + "".join(f"{column:>14}" for column in columns))
+    for name, timings in results.items():
+        cells = [f"{timings[0]:>12.2f} s"]
+        cells += [f"{t / operations * 1e6:>11.2f} µs" if t is not None else f"{'n/a':>14}"
+                  for t in timings[1:]]
+        print(f"{name:12}" + "".join(cells))
+    print()
+    del tree, table
+
+    ranked = OrderStatisticTree(sorted_keys)
+    updates = list(zip(victims, fresh))
+    ranges = [tuple(sorted(rng.sample(range(n * 10), 2))) for _ in range(operations)]
+    positions = [rng.randint(1, len(sorted_keys)) for _ in range(operations)]
+
+    def tree_updates():
+        for old, new in updates:
+            ranked.insert(old)
+            ranked.delete(new)
+
+    def list_updates():
+        for old, new in updates:
+            bisect.insort(sorted_keys, old)
+            sorted_delete(new)
+
+    def list_range_sum(lo, hi):
+        return sum(sorted_keys[bisect.bisect_left(sorted_keys, lo):bisect.bisect_right(sorted_keys, hi)])
+
+    statistics = {
+        "OrderStatisticTree": [
+            timed(tree_updates),
+            timed(lambda: [ranked.kth_smallest(k) for k in positions]),
+            timed(lambda: [ranked.rank(key) for key in queries]),
+            timed(lambda: [ranked.range_sum(lo, hi) for lo, hi in ranges]),
+        ],
+        "sorted list": [
+            timed(list_updates),
+            timed(lambda: [sorted_keys[k - 1] for k in positions]),
+            timed(lambda: [bisect.bisect_left(sorted_keys, key) for key in queries]),
+            timed(lambda: [list_range_sum(lo, hi) for lo, hi in ranges]),
+        ],
+    }
+    assert list(ranked) == sorted_keys
+    assert all(ranked.range_sum(lo, hi) == list_range_sum(lo, hi) for lo, hi in ranges[:100])
+    print(f"Order statistics: {operations:,} of each operation on {len(ranked):,} keys")
+    print()
+    columns = ["update", "kth_smallest", "rank", "range_sum"]
+    print(f"{'':20}" + "".join(f"{column:>14}" for column in columns))
+    for name, timings in statistics.items():
+        print(f"{name:20}" + "".join(f"{t / operations * 1e6:>11.2f} µs" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
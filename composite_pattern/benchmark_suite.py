@@ -0,0 +1,321 @@
+"""
+Benchmark Suite for Composite Pattern
+Times the core tree operations across tree shapes and sizes and writes
+the results as JSON, so that releases can be compared.
+
+    python benchmark_suite.py                          # 10^3 .. 10^6 nodes
+    python benchmark_suite.py --sizes 1e3,1e5,1e7 --shapes wide,power_law
+    python benchmark_suite.py --output new.json --compare old.json
+
+Shapes (see synthetic_trees.py):
+    deep       a chain of directories, one file each
+    wide       breadth-first directories with 10 subdirectories and 10 files
+    power_law  heavy-tailed files per directory and fan-out, log-normal sizes
+
+For every shape and size the suite records seconds, throughput (items per
+second) and, unless --no-memory is given, the peak memory allocated while
+the operation runs (a separate tracemalloc run, so tracing does not skew
+the timings). Each operation also gets a scaling exponent: the slope of
+log(seconds) against log(nodes), about 1 for whole-tree operations and
+about 0 for the fixed batch of point operations (add/remove, lookup).
+
+Recursive operations that exceed the recursion limit are recorded as
+errors. Renderers whose output would exceed --max-render-chars are
+recorded as skipped; deep chains produce output quadratic in their depth.
+Likewise add/remove and lookups cost O(depth) each and are skipped on
+chains so deep that the batch would be impractically slow.
+"""
+
+import contextlib
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from file import File
+from directory import Directory
+from synthetic_trees import build_deep_tree, build_fanout_tree, build_power_law_tree
+from tree_visualizer import TreeVisualizer
+
+
+SHAPES: Dict[str, Callable[[int], Directory]] = {
+    "deep": lambda nodes: build_deep_tree(max(0, nodes // 2 - 1)),
+    "wide": build_fanout_tree,
+    "power_law": build_power_law_tree,
+}
+
+WHOLE_TREE_OPERATIONS = ["build", "get_size", "display", "draw_tree", "draw_ascii_tree",
+                         "draw_graphical_tree", "write_tree:unicode", "write_tree:ascii",
+                         "write_tree:graphical"]
+POINT_OPERATIONS = ["add_remove", "resolve"]
+
+
+class _NullWriter:
+    """Text stream that discards everything written to it"""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def _tree_stats(root: Directory) -> Tuple[List, List[Tuple[Directory, int]],
+                                          List[Tuple[File, int]], int]:
+    """(all nodes, (directory, depth), (file, depth), estimated characters of a rendering)"""
+    nodes = []
+    directories = []
+    files = []
+    characters = 0
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        nodes.append(node)
+        characters += 4 * depth + len(node.name) + 24
+        if isinstance(node, Directory):
+            directories.append((node, depth))
+            stack.extend((child, depth + 1) for child in node.children)
+        else:
+            files.append((node, depth))
+    return nodes, directories, files, characters
+
+
+def _path_of(node: File) -> str:
+    parts = []
+    while node.parent is not None:
+        parts.append(node.name)
+        node = node.parent
+    return "/".join(reversed(parts))
+
+
+def measure(operation: Callable[[], object], items: int, trace_memory: bool) -> Dict:
+    """Time one run of `operation`; optionally trace a second run for its peak memory"""
+    gc.collect()
+    try:
+        start = time.perf_counter()
+        operation()
+        seconds = time.perf_counter() - start
+    except RecursionError:
+        return {"error": "RecursionError"}
+    result = {"seconds": seconds, "items": items,
+              "throughput": items / seconds if seconds > 0 else None}
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        operation()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def benchmark_shape(shape: str, size: int, point_ops: int, max_render_chars: int,
+                    trace_memory: bool, max_point_steps: int = 20_000_000,
+                    seed: int = 0) -> Dict[str, Dict]:
+    """Run every operation on one tree; returns {operation: measurement}"""
+    build = SHAPES[shape]
+    results: Dict[str, Dict] = {}
+    if trace_memory:
+        # The kept tree is built untraced; this traced build only reports memory
+        tracemalloc.start()
+        build(size)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        gc.collect()
+    gc.collect()
+    start = time.perf_counter()
+    root = build(size)
+    seconds = time.perf_counter() - start
+    nodes, directories, files, characters = _tree_stats(root)
+    results["build"] = {"seconds": seconds, "items": len(nodes), "throughput": len(nodes) / seconds}
+    if trace_memory:
+        results["build"]["peak_bytes"] = peak
+
+    results["get_size"] = measure(lambda: [node.get_size() for node in nodes], len(nodes), trace_memory)
+
+    def display() -> None:
+        with contextlib.redirect_stdout(_NullWriter()):
+            root.display()
+
+    renderers = {
+        "display": display,
+        "draw_tree": lambda: TreeVisualizer.draw_tree(root),
+        "draw_ascii_tree": lambda: TreeVisualizer.draw_ascii_tree(root),
+        "draw_graphical_tree": lambda: TreeVisualizer.draw_graphical_tree(root),
+    }
+    for style in TreeVisualizer.STYLES:
+        renderers[f"write_tree:{style}"] = (
+            lambda style=style: TreeVisualizer.write_tree(root, _NullWriter(), style=style))
+    for name, render in renderers.items():
+        if characters > max_render_chars:
+            results[name] = {"skipped": f"output of ~{characters:,} characters"}
+        else:
+            results[name] = measure(render, len(nodes), trace_memory)
+
+    # Both point operations cost O(depth) each, so they are skipped when a
+    # batch would walk more than max_point_steps ancestors in total
+    rng = random.Random(seed)
+    targets = [rng.choice(directories) for _ in range(point_ops)]
+    steps = sum(depth for _, depth in targets)
+
+    def add_remove() -> None:
+        for directory, _ in targets:
+            probe = File("__benchmark_probe__", 1)
+            directory.add(probe)
+            directory.remove(probe)
+
+    if steps > max_point_steps:
+        results["add_remove"] = {"skipped": f"~{steps:,} ancestor updates"}
+    else:
+        results["add_remove"] = measure(add_remove, point_ops, trace_memory)
+
+    samples = [rng.choice(files) for _ in range(point_ops)] if files else []
+    steps = sum(depth for _, depth in samples)
+    if steps > max_point_steps:
+        results["resolve"] = {"skipped": f"~{steps:,} path components"}
+    else:
+        paths = [_path_of(node) for node, _ in samples]
+        results["resolve"] = measure(lambda: [root.resolve(path) for path in paths],
+                                     len(paths), trace_memory)
+    return results
+
+
+def scaling_exponent(points: List[Tuple[int, float]]) -> Optional[float]:
+    """Least-squares slope of log(seconds) against log(nodes)"""
+    points = [(n, s) for n, s in points if n > 0 and s > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(s) for _, s in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    if spread == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread
+
+
+def run_suite(shapes: List[str], sizes: List[int], point_ops: int = 1000,
+              max_render_chars: int = 200_000_000, trace_memory: bool = True,
+              progress: Optional[Callable[[str], None]] = None) -> Dict:
+    """Benchmark every shape at every size; returns the JSON-ready report"""
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "settings": {"sizes": sizes, "point_ops": point_ops,
+                     "max_render_chars": max_render_chars, "trace_memory": trace_memory},
+        "shapes": {},
+    }
+    for shape in shapes:
+        runs = []
+        for size in sizes:
+            if progress:
+                progress(f"{shape} {size:,}")
+            operations = benchmark_shape(shape, size, point_ops, max_render_chars, trace_memory)
+            runs.append({"nodes": operations["build"]["items"], "operations": operations})
+        exponents = {}
+        for operation in WHOLE_TREE_OPERATIONS + POINT_OPERATIONS:
+            exponent = scaling_exponent([(run["nodes"], run["operations"][operation]["seconds"])
+                                         for run in runs if "seconds" in run["operations"][operation]])
+            exponents[operation] = None if exponent is None else round(exponent, 3)
+        report["shapes"][shape] = {"runs": runs, "scaling_exponents": exponents}
+    return report
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """Operations whose throughput fell by more than `tolerance` against a baseline report"""
+    regressions = []
+    for shape, data in report["shapes"].items():
+        old_runs = {run["nodes"]: run for run in baseline.get("shapes", {}).get(shape, {}).get("runs", [])}
+        for run in data["runs"]:
+            old_run = old_runs.get(run["nodes"])
+            if old_run is None:
+                continue
+            for operation, result in run["operations"].items():
+                old = old_run["operations"].get(operation, {}).get("throughput")
+                new = result.get("throughput")
+                if old and new and new < old * (1 - tolerance):
+                    regressions.append(f"{shape} {run['nodes']:,} nodes {operation}: "
+                                       f"{old:,.0f} -> {new:,.0f} items/s ({new / old - 1:+.0%})")
+    return regressions
+
+
+def _print_report(report: Dict) -> None:
+    for shape, data in report["shapes"].items():
+        print(f"{shape}:")
+        header = f"   {'operation':22}" + "".join(f"{run['nodes']:>14,}" for run in data["runs"])
+        print(header + f"{'exponent':>10}")
+        for operation in WHOLE_TREE_OPERATIONS + POINT_OPERATIONS:
+            cells = []
+            for run in data["runs"]:
+                result = run["operations"][operation]
+                if "throughput" in result and result["throughput"]:
+                    cells.append(f"{result['throughput']:>10,.0f}/s  ")
+                else:
+                    cells.append(f"{'error' if 'error' in result else 'skipped':>14}")
+            exponent = data["scaling_exponents"][operation]
+            print(f"   {operation:22}" + "".join(cells)
+                  + (f"{exponent:>10.2f}" if exponent is not None else f"{'-':>10}"))
+        print()
+
+
+def _option(args: List[str], name: str, default: Optional[str]) -> Optional[str]:
+    if name not in args:
+        return default
+    position = args.index(name)
+    value = args[position + 1]
+    del args[position:position + 2]
+    return value
+
+
+def main():
+    """Run the suite, print a throughput table and write the JSON report"""
+    args = sys.argv[1:]
+    trace_memory = "--no-memory" not in args
+    if not trace_memory:
+        args.remove("--no-memory")
+    sizes = [int(float(size)) for size in _option(args, "--sizes", "1e3,1e4,1e5,1e6").split(",")]
+    shapes = _option(args, "--shapes", ",".join(SHAPES)).split(",")
+    output = _option(args, "--output", "benchmark_results.json")
+    baseline_path = _option(args, "--compare", None)
+    point_ops = int(_option(args, "--point-ops", "1000"))
+    max_render_chars = int(float(_option(args, "--max-render-chars", "2e8")))
+    for shape in shapes:
+        if shape not in SHAPES:
+            raise SystemExit(f"Unknown shape {shape!r}; choose from {', '.join(SHAPES)}")
+
+    print("=" * 80)
+    print("COMPOSITE PATTERN - BENCHMARK SUITE")
+    print("=" * 80)
+    print()
+    report = run_suite(shapes, sizes, point_ops, max_render_chars, trace_memory,
+                       progress=lambda label: print(f"   running {label} nodes...", file=sys.stderr))
+    _print_report(report)
+    with open(output, "w") as stream:
+        json.dump(report, stream, indent=2)
+    print(f"Report written to {output}")
+
+    if baseline_path:
+        with open(baseline_path) as stream:
+            regressions = compare(report, json.load(stream))
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {baseline_path}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"No regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
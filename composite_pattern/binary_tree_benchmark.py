@@ -0,0 +1,120 @@
+"""
+Binary Tree Traversal Benchmark
+Compares the iterative traversals of binary_tree_composite.py with the
+recursive, list-extending versions they replaced.
+
+The recursive versions copy each subtree's list into its parent's, so a
+skewed tree costs O(n^2) copies, and they fail with RecursionError once
+the tree is deeper than the recursion limit.
+"""
+
+import sys
+import time
+from typing import Callable, List, Optional
+
+from binary_tree_composite import BinaryNode, LeafNode, TreeNode
+
+
+def build_skewed_tree(n: int, side: str = "left") -> TreeNode:
+    """A chain of n nodes hanging to one side (values n-1 .. 0 from the root)"""
+    node: TreeNode = LeafNode(0)
+    for value in range(1, n):
+        parent = BinaryNode(value)
+        if side == "left":
+            parent.set_left(node)
+        else:
+            parent.set_right(node)
+        node = parent
+    return node
+
+
+def build_complete_tree(n: int) -> TreeNode:
+    """A complete tree of n nodes in heap layout; values are level-order indices"""
+    nodes: List[TreeNode] = [BinaryNode(i) if 2 * i + 1 < n else LeafNode(i) for i in range(n)]
+    for i in range(n // 2):
+        nodes[i].set_left(nodes[2 * i + 1])
+        if 2 * i + 2 < n:
+            nodes[i].set_right(nodes[2 * i + 2])
+    return nodes[0]
+
+
+# The recursive implementations the iterators replaced ---------------------
+
+def recursive_inorder(node: TreeNode) -> list:
+    result = []
+    if node.left:
+        result.extend(recursive_inorder(node.left))
+    result.append(node.value)
+    if node.right:
+        result.extend(recursive_inorder(node.right))
+    return result
+
+
+def recursive_height(node: TreeNode) -> int:
+    left_height = recursive_height(node.left) if node.left else -1
+    right_height = recursive_height(node.right) if node.right else -1
+    return 1 + max(left_height, right_height)
+
+
+def recursive_sum(node: TreeNode) -> int:
+    left_sum = recursive_sum(node.left) if node.left else 0
+    right_sum = recursive_sum(node.right) if node.right else 0
+    return node.value + left_sum + right_sum
+
+
+def _time(func: Callable[[], object]) -> Optional[float]:
+    """Seconds for one call, or None if it exceeded the recursion limit"""
+    start = time.perf_counter()
+    try:
+        func()
+    except RecursionError:
+        return None
+    return time.perf_counter() - start
+
+
+def _cell(seconds: Optional[float]) -> str:
+    return f"{seconds * 1e3:12.1f} ms" if seconds is not None else f"{'RecursionError':>15}"
+
+
+def benchmark(label: str, root: TreeNode) -> None:
+    print(f"{label}:")
+    rows = [
+        ("inorder list", lambda: root.inorder(), lambda: recursive_inorder(root)),
+        ("height", lambda: root.get_height(), lambda: recursive_height(root)),
+        ("sum", lambda: root.sum_values(), lambda: recursive_sum(root)),
+        ("iter_preorder", lambda: sum(1 for _ in root.iter_preorder()), None),
+        ("iter_postorder", lambda: sum(1 for _ in root.iter_postorder()), None),
+        ("iter_levelorder", lambda: sum(1 for _ in root.iter_levelorder()), None),
+        ("first 10 inorder", lambda: [v for _, v in zip(range(10), root.iter_inorder())], None),
+    ]
+    print(f"   {'operation':18} {'iterative':>15} {'recursive':>15}")
+    for name, iterative, recursive in rows:
+        recursive_cell = _cell(_time(recursive)) if recursive else ""
+        print(f"   {name:18} {_cell(_time(iterative))} {recursive_cell}")
+    print()
+
+
+def main():
+    """Time traversals on skewed and balanced trees (default 10^6 nodes)"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 60)
+    print("BINARY TREE - ITERATIVE VS RECURSIVE TRAVERSALS")
+    print("=" * 60)
+    print()
+
+    balanced = build_complete_tree(n)
+    assert balanced.inorder() == recursive_inorder(balanced)
+    benchmark(f"Balanced tree, {n:,} nodes", balanced)
+    del balanced
+
+    benchmark(f"Left-skewed tree, {n:,} nodes", build_skewed_tree(n))
+
+    # Below the recursion limit the recursive version still pays O(n^2) copying
+    limit = sys.getrecursionlimit() - 50
+    benchmark(f"Left-skewed tree, {limit:,} nodes (within the recursion limit)",
+              build_skewed_tree(limit))
+
+
+if __name__ == "__main__":
+    main()
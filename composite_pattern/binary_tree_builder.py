@@ -0,0 +1,313 @@
+"""
+Binary Tree Builders and Serialization
+Builds BinaryNode/LeafNode trees from data in O(n) instead of by hand,
+and packs them into a compact binary format.
+
+- build_balanced(values): height-balanced tree from a sorted iterable
+- build_from_traversals(preorder, inorder): the unique tree with those orders
+- build_from_levelorder(values): tree from a level-order list with None gaps
+- serialize(root) / deserialize(data): struct-packed values plus a shape bitmap
+
+Builders keep an explicit stack, so input size is not bounded by the
+recursion limit. Nodes with children are BinaryNodes, childless nodes are
+LeafNodes, as in the hand-built sample trees. The cyclic garbage collector
+is paused while a tree is built: every new node would otherwise count
+towards its next pass, which rescans all the nodes created so far.
+
+Serialized layout (little-endian):
+    header   magic b"BTRE", value format (1 byte), node count (uint64)
+    shape    2 bits per node in level order: bit 0 = has left, bit 1 = has right
+    values   node values in level order, packed with the value format
+
+Usage: python binary_tree_builder.py [node count]
+"""
+
+import functools
+import gc
+import pickle
+import struct
+import sys
+import time
+from typing import Callable, Iterable, List, Optional
+
+from binary_tree_composite import BinaryNode, LeafNode, TreeNode
+
+
+MAGIC = b"BTRE"
+_HEADER = struct.Struct("<4scQ")
+# Fixed-size struct codes accepted for node values
+VALUE_FORMATS = "bBhHiIlLqQefd"
+
+# Shape byte -> its four 2-bit child flags
+_UNPACK = [bytes((b & 3, b >> 2 & 3, b >> 4 & 3, b >> 6)) for b in range(256)]
+
+
+def _make_node(value, has_children: bool) -> TreeNode:
+    return BinaryNode(value) if has_children else LeafNode(value)
+
+
+def _gc_paused(build: Callable) -> Callable:
+    """Run a builder with the cyclic garbage collector disabled"""
+    @functools.wraps(build)
+    def wrapper(*args, **kwargs):
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return build(*args, **kwargs)
+        finally:
+            if was_enabled:
+                gc.enable()
+    return wrapper
+
+
+@_gc_paused
+def build_balanced(values: Iterable) -> TreeNode:
+    """
+    Height-balanced tree over sorted values in O(n)
+
+    Each range's middle value becomes its subtree root, so the inorder
+    traversal returns the values unchanged. Raises ValueError if the
+    values are empty or not in non-decreasing order.
+    """
+    values = list(values)
+    if not values:
+        raise ValueError("cannot build a tree from no values")
+    for i in range(1, len(values)):
+        if values[i] < values[i - 1]:
+            raise ValueError(f"values are not sorted at position {i}")
+
+    root = None
+    stack = [(0, len(values), None, False)]
+    while stack:
+        lo, hi, parent, is_left = stack.pop()
+        mid = (lo + hi) // 2
+        node = _make_node(values[mid], hi - lo > 1)
+        if parent is None:
+            root = node
+        elif is_left:
+            parent.set_left(node)
+        else:
+            parent.set_right(node)
+        if lo < mid:
+            stack.append((lo, mid, node, True))
+        if mid + 1 < hi:
+            stack.append((mid + 1, hi, node, False))
+    return root
+
+
+@_gc_paused
+def build_from_traversals(preorder: Iterable, inorder: Iterable) -> TreeNode:
+    """
+    Rebuild a tree from its preorder and inorder traversals in O(n)
+
+    Values must be distinct (hashable); otherwise the tree is ambiguous.
+    Raises ValueError if the traversals do not describe one tree.
+    """
+    preorder = list(preorder)
+    inorder = list(inorder)
+    if not preorder:
+        raise ValueError("cannot build a tree from no values")
+    if len(preorder) != len(inorder):
+        raise ValueError("preorder and inorder must have the same length")
+    position = {value: i for i, value in enumerate(inorder)}
+    if len(position) != len(inorder):
+        raise ValueError("values must be distinct")
+
+    root = None
+    # (preorder start, inorder start, subtree size, parent, is_left)
+    stack = [(0, 0, len(preorder), None, False)]
+    while stack:
+        pre_start, in_start, size, parent, is_left = stack.pop()
+        value = preorder[pre_start]
+        split = position.get(value, -1)
+        if not in_start <= split < in_start + size:
+            raise ValueError(f"traversals disagree about the subtree rooted at {value!r}")
+        node = _make_node(value, size > 1)
+        if parent is None:
+            root = node
+        elif is_left:
+            parent.set_left(node)
+        else:
+            parent.set_right(node)
+        left_size = split - in_start
+        right_size = size - left_size - 1
+        if right_size:
+            stack.append((pre_start + 1 + left_size, split + 1, right_size, node, False))
+        if left_size:
+            stack.append((pre_start + 1, in_start, left_size, node, True))
+    return root
+
+
+@_gc_paused
+def build_from_levelorder(values: Iterable) -> TreeNode:
+    """
+    Rebuild a tree from a level-order list in O(n)
+
+    Every node owns the next two entries for its left and right child,
+    with None marking a missing child; trailing Nones may be dropped:
+    [10, 5, 15, None, 7] is 10 with children 5 and 15, and 7 right of 5.
+    """
+    slots = list(values)
+    if not slots or slots[0] is None:
+        raise ValueError("the first level-order value must be the root")
+
+    # The k-th node (in level order) owns slots 2k+1 and 2k+2
+    owners: List[int] = []
+    for slot, value in enumerate(slots):
+        if value is None:
+            continue
+        if slot and ((slot - 1) // 2 >= len(owners) or owners[(slot - 1) // 2] >= slot):
+            raise ValueError(f"value at position {slot} has no parent")
+        owners.append(slot)
+
+    def child(k: int, offset: int) -> Optional[int]:
+        slot = 2 * k + offset
+        return slot if slot < len(slots) and slots[slot] is not None else None
+
+    nodes = {}
+    for k, slot in enumerate(owners):
+        has_children = child(k, 1) is not None or child(k, 2) is not None
+        nodes[slot] = _make_node(slots[slot], has_children)
+    for k, slot in enumerate(owners):
+        left, right = child(k, 1), child(k, 2)
+        if left is not None:
+            nodes[slot].set_left(nodes[left])
+        if right is not None:
+            nodes[slot].set_right(nodes[right])
+    return nodes[0]
+
+
+def to_levelorder(root: TreeNode) -> list:
+    """Level-order values with None for missing children, as build_from_levelorder reads them"""
+    result = []
+    nodes = [root]
+    for node in nodes:
+        if node is None:
+            result.append(None)
+            continue
+        result.append(node.value)
+        nodes.append(node.left)
+        nodes.append(node.right)
+    while result[-1] is None:
+        result.pop()
+    return result
+
+
+def serialize(root: TreeNode, value_format: str = "q") -> bytes:
+    """
+    Pack a tree into bytes: header, 2-bit shape flags per node, packed values
+
+    value_format is a fixed-size struct code ("q" int64 by default, "d"
+    for floats, "i", "h", "b", ... for narrower integers). Raises
+    ValueError if a value does not fit the format.
+    """
+    if len(value_format) != 1 or value_format not in VALUE_FORMATS:
+        raise ValueError(f"unsupported value format {value_format!r}")
+    values = []
+    flags = bytearray()
+    nodes = [root]
+    for node in nodes:
+        values.append(node.value)
+        left, right = node.left, node.right
+        flags.append((left is not None) | (right is not None) << 1)
+        if left is not None:
+            nodes.append(left)
+        if right is not None:
+            nodes.append(right)
+
+    flags.extend(bytes(-len(flags) % 4))
+    shape = bytes(a | b << 2 | c << 4 | d << 6
+                  for a, b, c, d in zip(flags[0::4], flags[1::4], flags[2::4], flags[3::4]))
+    try:
+        packed = struct.pack(f"<{len(values)}{value_format}", *values)
+    except struct.error as error:
+        raise ValueError(f"values do not fit format {value_format!r}: {error}") from None
+    return _HEADER.pack(MAGIC, value_format.encode(), len(values)) + shape + packed
+
+
+@_gc_paused
+def deserialize(data: bytes) -> TreeNode:
+    """Rebuild the tree written by serialize(); raises ValueError on malformed data"""
+    if len(data) < _HEADER.size:
+        raise ValueError("data is too short for a tree header")
+    magic, value_format, count = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("data is not a serialized binary tree")
+    value_format = value_format.decode("latin-1")
+    if value_format not in VALUE_FORMATS:
+        raise ValueError(f"unsupported value format {value_format!r}")
+    shape_size = (count + 3) // 4
+    values_size = count * struct.calcsize(f"<{value_format}")
+    if count == 0 or len(data) != _HEADER.size + shape_size + values_size:
+        raise ValueError("data length does not match the node count")
+
+    shape = data[_HEADER.size:_HEADER.size + shape_size]
+    flags = b"".join(map(_UNPACK.__getitem__, shape))[:count]
+    if flags.count(1) + flags.count(2) + 2 * flags.count(3) != count - 1:
+        raise ValueError("shape bitmap does not describe a tree")
+    values = struct.unpack_from(f"<{count}{value_format}", data, _HEADER.size + shape_size)
+
+    nodes = [BinaryNode(value) if flag else LeafNode(value) for value, flag in zip(values, flags)]
+    # Children follow in level order, so one cursor hands them out
+    next_child = 1
+    for i, (node, flag) in enumerate(zip(nodes, flags)):
+        if next_child <= i:
+            raise ValueError("shape bitmap does not describe a tree")
+        if flag & 1:
+            node.set_left(nodes[next_child])
+            next_child += 1
+        if flag & 2:
+            node.set_right(nodes[next_child])
+            next_child += 1
+    return nodes[0]
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    """Build, rebuild and round-trip a balanced tree (default 10^6 nodes)"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=" * 80)
+    print("BINARY TREE COMPOSITE - BULK BUILDERS AND SERIALIZATION")
+    print("=" * 80)
+    print()
+    small = build_balanced([10, 25, 30, 50, 60, 75, 80])
+    print(small.display())
+    rebuilt = build_from_levelorder([10, 5, 15, None, 7, None, 20])
+    print(rebuilt.display())
+    print(f"level order {to_levelorder(rebuilt)}, {len(serialize(rebuilt))} bytes serialized")
+    print()
+
+    print(f"{n:,} nodes")
+    root, seconds = _timed(lambda: build_balanced(range(n)))
+    print(f"   build_balanced          {seconds:8.2f} s   (height {root.get_height()})")
+    preorder, inorder = root.preorder(), root.inorder()
+    copy, seconds = _timed(lambda: build_from_traversals(preorder, inorder))
+    assert copy.preorder() == preorder and copy.inorder() == inorder
+    print(f"   build_from_traversals   {seconds:8.2f} s")
+    levelorder = to_levelorder(root)
+    copy, seconds = _timed(lambda: build_from_levelorder(levelorder))
+    assert to_levelorder(copy) == levelorder
+    print(f"   build_from_levelorder   {seconds:8.2f} s")
+    del preorder, inorder, levelorder, copy
+
+    for value_format in ("q", "i"):
+        data, write_time = _timed(lambda: serialize(root, value_format))
+        copy, read_time = _timed(lambda: deserialize(data))
+        assert to_levelorder(copy) == to_levelorder(root)
+        print(f"   serialize '{value_format}'           {write_time:8.2f} s   deserialize {read_time:6.2f} s"
+              f"   {len(data) / n:5.2f} B/node")
+        del copy
+    data, write_time = _timed(lambda: pickle.dumps(root, pickle.HIGHEST_PROTOCOL))
+    _, read_time = _timed(lambda: pickle.loads(data))
+    print(f"   pickle (baseline)       {write_time:8.2f} s   deserialize {read_time:6.2f} s"
+          f"   {len(data) / n:5.2f} B/node")
+
+
+if __name__ == "__main__":
+    main()
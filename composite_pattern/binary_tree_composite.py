@@ -1,10 +1,24 @@
 """
 Binary Tree Implementation using Composite Pattern
 Demonstrates how Composite pattern naturally maps to tree structures
+
+Traversals and aggregates walk the tree with an explicit stack or queue
+rather than recursion, so they work on trees of any depth (a skewed tree
+is effectively a linked list) and each value is visited once. The
+iter_* generators yield values lazily; inorder()/preorder()/postorder()
+collect them into lists.
+
+display() is built by the same kind of walk. For large trees use
+iter_display()/write_display(), which produce one line at a time,
+optionally truncated by depth and by the number of nodes shown, and can
+lay the tree out sideways within a terminal width.
 """
 
+import shutil
+import sys
 from abc import ABC, abstractmethod
-from typing import Optional
+from collections import deque
+from typing import Iterator, List, Optional, TextIO, Tuple
 
 
 # Component
@@ -49,10 +63,191 @@ class TreeNode(ABC):
         """Postorder traversal: left -> right -> root"""
         pass
 
+    def iter_preorder(self) -> Iterator:
+        """Lazily yield values root -> left -> right"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node.value
+            if node.right is not None:
+                stack.append(node.right)
+            if node.left is not None:
+                stack.append(node.left)
+
+    def iter_inorder(self) -> Iterator:
+        """Lazily yield values left -> root -> right"""
+        stack = []
+        node = self
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.value
+            node = node.right
+
+    def iter_postorder(self) -> Iterator:
+        """Lazily yield values left -> right -> root"""
+        stack = []
+        node = self
+        last = None
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            if top.right is not None and top.right is not last:
+                node = top.right
+            else:
+                yield top.value
+                last = stack.pop()
+
+    def iter_levelorder(self) -> Iterator:
+        """Lazily yield values level by level, left to right"""
+        queue = deque([self])
+        while queue:
+            node = queue.popleft()
+            yield node.value
+            if node.left is not None:
+                queue.append(node.left)
+            if node.right is not None:
+                queue.append(node.right)
+
+    # Elided subtrees are counted up to this many nodes ("… 10,000+ nodes")
+    DISPLAY_COUNT_LIMIT = 10_000
+
+    def iter_display(self, max_depth: Optional[int] = None, max_nodes: Optional[int] = None,
+                     sideways: bool = False, width: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the tree diagram one line at a time, without recursion
+
+        max_depth: deepest level shown (the root is level 0)
+        max_nodes: nodes shown before the remaining subtrees are elided
+        sideways:  root on the left, right subtree above it and left below,
+                   with lines cut to `width` columns (default: the terminal)
+
+        Each elided subtree is summarised in place, e.g. "└── … 48,211 nodes".
+        Memory use is proportional to the depth of the tree, not its size:
+        pending children carry no prefix, and the one prefix in use grows
+        and shrinks a segment at a time as the walk moves between levels.
+        """
+        if sideways:
+            return self._sideways_lines(max_depth, max_nodes, width)
+        return self._display_lines("", True, max_depth, max_nodes)
+
+    def write_display(self, stream: Optional[TextIO] = None, **options) -> int:
+        """Write iter_display(**options) line by line to a text stream; returns lines written"""
+        stream = sys.stdout if stream is None else stream
+        count = 0
+        for line in self.iter_display(**options):
+            stream.write(line)
+            stream.write("\n")
+            count += 1
+        return count
+
+    def _elided(self, *others: 'TreeNode') -> str:
+        """Summary of this subtree (and others), counting at most DISPLAY_COUNT_LIMIT nodes"""
+        limit = self.DISPLAY_COUNT_LIMIT
+        count = 0
+        stack = [self, *others]
+        while stack and count < limit:
+            node = stack.pop()
+            count += 1
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        if stack:
+            return f"… {count:,}+ nodes"
+        return "… 1 node" if count == 1 else f"… {count:,} nodes"
+
+    def _display_lines(self, prefix: str, is_tail: bool, max_depth: Optional[int],
+                       max_nodes: Optional[int]) -> Iterator[str]:
+        """Lines of display(): right child above left, ∅ for a missing child"""
+        shown = 0
+        # Items are (node, is_tail, depth), with None for a missing child.
+        # They carry no prefix: `segments` holds the "│   " or "    " added
+        # below each open level and is cut back as the walk climbs out
+        stack: List[Tuple[Optional[TreeNode], bool, int]] = [(self, is_tail, 0)]
+        segments: List[str] = []
+        while stack:
+            node, is_tail, depth = stack.pop()
+            while len(segments) > depth:
+                prefix = prefix[:len(prefix) - len(segments.pop())]
+            connector = "└── " if is_tail else "├── "
+            if node is None:
+                yield f"{prefix}{connector}∅"
+                continue
+            if max_nodes is not None and shown >= max_nodes:
+                yield f"{prefix}{connector}{node._elided()}"
+                continue
+            shown += 1
+            if isinstance(node, LeafNode):
+                yield f"{prefix}{connector}🍃 {node.value}"
+                continue
+            yield f"🌳 {node.value}" if prefix == "" else f"{prefix}{connector}🔵 {node.value}"
+            if node.left is None and node.right is None:
+                continue
+            segment = "    " if is_tail else "│   "
+            if max_depth is not None and depth >= max_depth:
+                children = [child for child in (node.right, node.left) if child is not None]
+                yield f"{prefix}{segment}└── {children[0]._elided(*children[1:])}"
+                continue
+            segments.append(segment)
+            prefix += segment
+            stack.append((node.left, True, depth + 1))
+            stack.append((node.right, False, depth + 1))
+
+    def _sideways_lines(self, max_depth: Optional[int], max_nodes: Optional[int],
+                        width: Optional[int]) -> Iterator[str]:
+        """Lines of the sideways layout, fitted to `width` columns"""
+        if width is None:
+            width = shutil.get_terminal_size().columns
+        # Keep room for a label or an elided-subtree summary at the deepest level
+        fitting_depth = max(0, (width - 20) // 4)
+        max_depth = fitting_depth if max_depth is None else min(max_depth, fitting_depth)
+
+        def fit(line: str) -> str:
+            return line if len(line) <= width else line[:max(width - 1, 0)] + "…"
+
+        shown = 0
+        # Items are (node, connector, segment, depth, label only). As in
+        # _display_lines they carry no prefix: a node's prefix is
+        # segments[0..depth], its own segment last
+        stack: List[Tuple[TreeNode, str, str, int, bool]] = [(self, "", "", 0, False)]
+        segments: List[str] = []
+        prefix = ""
+        while stack:
+            node, connector, segment, depth, label_only = stack.pop()
+            while len(segments) > depth:
+                prefix = prefix[:len(prefix) - len(segments.pop())]
+            segments.append(segment)
+            prefix += segment
+            if label_only:
+                yield fit(f"{prefix}{connector}{node.value}")
+                continue
+            if depth > max_depth or (max_nodes is not None and shown >= max_nodes):
+                yield fit(f"{prefix}{connector}{node._elided()}")
+                continue
+            shown += 1
+            # Above a "┌── " child nothing continues upwards; below it the
+            # line runs on to its parent, and the reverse for "└── "
+            above = "│   " if connector == "└── " else "    " if connector else ""
+            below = "│   " if connector == "┌── " else "    " if connector else ""
+            if node.left is not None:
+                stack.append((node.left, "└── ", below, depth + 1, False))
+            stack.append((node, connector, segment, depth, True))
+            if node.right is not None:
+                stack.append((node.right, "┌── ", above, depth + 1, False))
+
 
 # Leaf
 class LeafNode(TreeNode):
     """Leaf node - has no children (Leaf in Composite pattern)"""
+
+    # Empty child slots let the shared traversals skip type checks
+    left = None
+    right = None
     
     def display(self, prefix: str = "", is_tail: bool = True) -> str:
         connector = "└── " if is_tail else "├── "
@@ -99,79 +294,55 @@ class BinaryNode(TreeNode):
     
     def display(self, prefix: str = "", is_tail: bool = True) -> str:
         """Display tree structure using box-drawing characters"""
-        result = []
-        
-        # Current node
-        connector = "└── " if is_tail else "├── "
-        if prefix == "":
-            result.append(f"🌳 {self.value}")
-        else:
-            result.append(f"{prefix}{connector}🔵 {self.value}")
-        
-        # Prepare prefix for children
-        extension = "    " if is_tail else "│   "
-        new_prefix = prefix + extension
-        
-        # Display children
-        if self.left is not None or self.right is not None:
-            if self.right is not None:
-                result.append(self.right.display(new_prefix, False))
-            else:
-                result.append(f"{new_prefix}├── ∅")
-            
-            if self.left is not None:
-                result.append(self.left.display(new_prefix, True))
-            else:
-                result.append(f"{new_prefix}└── ∅")
-        
-        return "\n".join(result)
+        return "\n".join(self._display_lines(prefix, is_tail, None, None))
     
     def get_height(self) -> int:
-        """Calculate tree height"""
-        left_height = self.left.get_height() if self.left else -1
-        right_height = self.right.get_height() if self.right else -1
-        return 1 + max(left_height, right_height)
+        """Calculate tree height (edges on the longest root-to-leaf path)"""
+        # Parallel node/depth stacks: no per-node tuples for the GC to track
+        height = 0
+        nodes = [self]
+        depths = [0]
+        while nodes:
+            node = nodes.pop()
+            depth = depths.pop()
+            if depth > height:
+                height = depth
+            if node.left is not None:
+                nodes.append(node.left)
+                depths.append(depth + 1)
+            if node.right is not None:
+                nodes.append(node.right)
+                depths.append(depth + 1)
+        return height
     
     def count_nodes(self) -> int:
         """Count all nodes in subtree"""
-        left_count = self.left.count_nodes() if self.left else 0
-        right_count = self.right.count_nodes() if self.right else 0
-        return 1 + left_count + right_count
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            count += 1
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+        return count
     
     def sum_values(self) -> int:
         """Sum all values in subtree"""
-        left_sum = self.left.sum_values() if self.left else 0
-        right_sum = self.right.sum_values() if self.right else 0
-        return self.value + left_sum + right_sum
+        return sum(self.iter_preorder())
     
     def inorder(self) -> list:
         """Inorder traversal: left -> root -> right"""
-        result = []
-        if self.left:
-            result.extend(self.left.inorder())
-        result.append(self.value)
-        if self.right:
-            result.extend(self.right.inorder())
-        return result
+        return list(self.iter_inorder())
     
     def preorder(self) -> list:
         """Preorder traversal: root -> left -> right"""
-        result = [self.value]
-        if self.left:
-            result.extend(self.left.preorder())
-        if self.right:
-            result.extend(self.right.preorder())
-        return result
+        return list(self.iter_preorder())
     
     def postorder(self) -> list:
         """Postorder traversal: left -> right -> root"""
-        result = []
-        if self.left:
-            result.extend(self.left.postorder())
-        if self.right:
-            result.extend(self.right.postorder())
-        result.append(self.value)
-        return result
+        return list(self.iter_postorder())
 
 
 def create_sample_tree() -> BinaryNode:
@@ -296,6 +467,15 @@ def main():
     print(f"Sum of Values: {tree4.sum_values()}")
     print()
     
+    # Example 5: Streaming display with truncation and the sideways layout
+    print("=" * 80)
+    print("EXAMPLE 5: Streaming Display (max depth 1, then sideways)")
+    print("-" * 80)
+    tree1.write_display(max_depth=1)
+    print()
+    tree1.write_display(sideways=True, width=40)
+    print()
+    
     # Demonstrate Composite Pattern Benefits
     print("=" * 80)
     print("COMPOSITE PATTERN BENEFITS IN BINARY TREES")
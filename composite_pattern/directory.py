@@ -1,40 +1,414 @@
 """
 Directory - Composite class for Composite Pattern
 Represents directories that can contain files and other directories.
+
+Each directory caches the aggregate size, file count and directory count
+of its subtree. Children keep a back-link to their parent, so every
+add/remove (and every File size change) pushes a delta up the ancestor
+chain: queries are O(1) and mutations are O(depth).
+
+Children are also indexed by name, so finding a child is a dict lookup and
+resolving a relative path costs O(depth). To keep small directories lean
+the name map is only built once a directory holds more than
+NAME_INDEX_THRESHOLD children; below that a lookup scans the short child
+list. Empty directories share one empty tuple instead of owning a list. A root directory may carry a
+PathIndex (see path_index.py), which every mutation below it keeps in sync.
+
+The name map stores each child's position in the child list, so removing
+a child from a large directory is O(1): its slot becomes a hole instead
+of every later child shifting down. While holes remain, `children` is a
+read-only view that skips them (see ChildView); they are squeezed out
+once they fill half the list, so the cost is amortized O(1) per removal.
+
+Directories can optionally carry a Merkle digest (enable_digests()). A
+directory's digest is the sum, modulo 2**128, of one hash term per child
+built from the child's name, size and digest, so a mutation updates each
+ancestor's digest by the difference of a single term: O(depth) hashes.
+
+For the query engine (tree_query.py) each directory also caches the
+smallest and largest file size and the set of file extensions below it.
+These are recomputed lazily: a mutation only marks its ancestors stale.
+
+Objects registered with add_observer() on any directory are told about
+additions, removals and size changes below it (see TreeObserver).
 """
 
-from typing import List
-from file_system_component import FileSystemComponent
+import itertools
+import sys
+from collections.abc import Sequence as SequenceABC
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from file_system_component import (DIGEST_MASK, FileSystemComponent, digest_term,
+                                   extension_of)
+
+if TYPE_CHECKING:
+    from path_index import PathIndex
+
+
+NAME_INDEX_THRESHOLD = 32
+_NO_CHILDREN = ()
+
+
+class TreeObserver:
+    """Receives change notifications from Directory.add_observer()"""
+
+    def on_added(self, directory: 'Directory', components: Sequence[FileSystemComponent]) -> None:
+        """`components` (a tuple) were added to `directory`; its ancestors' sizes changed too"""
+        pass
+
+    def on_removed(self, directory: 'Directory', component: FileSystemComponent) -> None:
+        """`component` (now detached) was removed from `directory`"""
+        pass
+
+    def on_resized(self, component: FileSystemComponent) -> None:
+        """A file's size changed, and with it the sizes of its ancestors"""
+        pass
+
+
+class ChildView(SequenceABC):
+    """Read-only children of a directory whose child list still has holes"""
+
+    __slots__ = ("_slots", "_count")
+
+    def __init__(self, slots: List[Optional[FileSystemComponent]], count: int):
+        self._slots = slots
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return (child for child in self._slots if child is not None)
+
+    def __reversed__(self):
+        return (child for child in reversed(self._slots) if child is not None)
+
+    def __getitem__(self, index):
+        """O(n) with holes present: prefer iterating"""
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("child index out of range")
+        return next(itertools.islice(iter(self), index, None))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, ChildView)):
+            return list(self) == list(other)
+        return NotImplemented
 
 
 class Directory(FileSystemComponent):
     """Composite component representing a directory"""
-    
+
+    __slots__ = ("_children", "_holes", "_by_name", "_size", "_file_count", "_dir_count", "_digest",
+                 "_term", "_query_stats", "path_index", "_observers")
+
     def __init__(self, name: str):
         super().__init__(name)
-        self.children: List[FileSystemComponent] = []
-    
+        # A list once non-empty; removed children leave None holes while _by_name exists
+        self._children: List[Optional[FileSystemComponent]] = _NO_CHILDREN
+        self._holes = 0
+        self._by_name: Optional[Dict[str, int]] = None  # Name -> position, built when large
+        self._size = 0
+        self._file_count = 0
+        self._dir_count = 0
+        self._digest: Optional[int] = None  # None while digests are disabled
+        self._term = 0
+        self._query_stats: Optional[Tuple[Optional[int], Optional[int], FrozenSet[str]]] = None
+        self.path_index = None  # Set by PathIndex on a root directory
+        self._observers: Optional[List[TreeObserver]] = None
+
+    @property
+    def children(self) -> Sequence[FileSystemComponent]:
+        """Child components in the order they were added (a ChildView while holes remain)"""
+        if self._holes:
+            return ChildView(self._children, len(self._children) - self._holes)
+        return self._children
+
     def add(self, component: FileSystemComponent) -> None:
         """Add a component to this directory"""
-        self.children.append(component)
-    
+        self.add_all([component])
+
+    def add_all(self, components: Iterable[FileSystemComponent]) -> None:
+        """Add several components, pushing one combined delta to the ancestors"""
+        components = list(components)
+        # This directory and its ancestors: adding one of them would make a cycle
+        lineage = set()
+        node = self
+        while node is not None:
+            lineage.add(id(node))
+            node = node.parent
+        names = set()
+        for component in components:
+            if id(component) in lineage:
+                raise ValueError(f"'{component.name}' cannot be added to itself or a descendant")
+            if component.parent is not None:
+                raise ValueError(f"'{component.name}' already belongs to a directory")
+            if component.name in names or self._find(component.name) is not None:
+                raise ValueError(f"'{self.name}' already contains '{component.name}'")
+            names.add(component.name)
+        by_name = self._by_name
+        start = len(self._children)
+        if start:
+            self._children.extend(components)
+        else:
+            self._children = components  # A fresh list, allocated at its exact size
+        if by_name is not None:
+            by_name.update((component.name, start + i) for i, component in enumerate(components))
+        elif len(self._children) > NAME_INDEX_THRESHOLD:
+            self._by_name = {child.name: i for i, child in enumerate(self._children)}
+        size = files = dirs = digest_delta = 0
+        for component in components:
+            component.parent = self
+            child_size, child_files, child_dirs = self._rollup_of(component)
+            size += child_size
+            files += child_files
+            dirs += child_dirs
+            if self._digest is not None:
+                if isinstance(component, Directory) and component._digest is None:
+                    component.enable_digests()
+                digest_delta += component._digest_term()
+        self._propagate(size, files, dirs, digest_delta)
+
+        index = self._path_index()
+        if index is not None:
+            for component in components:
+                index._index_subtree(component)
+        observers = self._observers_above()
+        if observers:
+            # A tuple of just the new children, never the live child list
+            added = tuple(components)
+            for observer in observers:
+                observer.on_added(self, added)
+
     def remove(self, component: FileSystemComponent) -> None:
         """Remove a component from this directory"""
-        self.children.remove(component)
-    
+        if self._find(component.name) is not component:
+            raise ValueError(f"'{component.name}' is not in '{self.name}'")
+        index = self._path_index()
+        if index is not None:
+            index._unindex_subtree(component)
+        digest_delta = -component._digest_term() if self._digest is not None else 0
+        if self._by_name is not None:
+            self._children[self._by_name.pop(component.name)] = None
+            self._holes += 1
+            if self._holes > len(self._children) // 2:
+                self._compact()
+        else:
+            self._children.remove(component)
+        component.parent = None
+        size, files, dirs = self._rollup_of(component)
+        self._propagate(-size, -files, -dirs, digest_delta)
+        for observer in self._observers_above():
+            observer.on_removed(self, component)
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """Rename a child, keeping the name map and any path index in sync"""
+        component = self.get_child_by_name(old_name)
+        if new_name == old_name:
+            return
+        if self._find(new_name) is not None:
+            raise ValueError(f"'{self.name}' already contains '{new_name}'")
+        index = self._path_index()
+        if index is not None:
+            index._unindex_subtree(component)
+        old_term = component._digest_term() if self._digest is not None else 0
+        component.name = sys.intern(new_name) if component.INTERN_NAMES else new_name
+        if self._by_name is not None:
+            self._by_name[component.name] = self._by_name.pop(old_name)
+        # A directory's term hashes its name, even if only its own digest is enabled
+        if isinstance(component, Directory) and component._digest is not None:
+            component._term = component._compute_term()
+        digest_delta = component._digest_term() - old_term if self._digest is not None else 0
+        self._propagate(0, 0, 0, digest_delta)
+        if index is not None:
+            index._index_subtree(component)
+
     def get_child(self, index: int) -> FileSystemComponent:
         """Get a child component by index"""
         return self.children[index]
-    
+
+    def get_child_by_name(self, name: str) -> FileSystemComponent:
+        """Get a child component by name in O(1)"""
+        component = self._find(name)
+        if component is None:
+            raise KeyError(f"'{self.name}' has no child named '{name}'")
+        return component
+
+    def has_child(self, name: str) -> bool:
+        """Check whether a child with this name exists"""
+        return self._find(name) is not None
+
+    def resolve(self, path: str) -> FileSystemComponent:
+        """Resolve a '/'-separated path relative to this directory in O(depth)"""
+        node: FileSystemComponent = self
+        for part in path.strip("/").split("/"):
+            if not part:
+                continue
+            if not isinstance(node, Directory):
+                raise NotADirectoryError(f"'{node.name}' is not a directory")
+            node = node.get_child_by_name(part)
+        return node
+
     def display(self, indent: int = 0) -> None:
         """Display directory and all its contents recursively"""
         print(f"{'  ' * indent}📁 {self.name}/")
         for child in self.children:
             child.display(indent + 1)
-    
+
     def get_size(self) -> int:
-        """Calculate total size of directory (sum of all children)"""
-        total_size = 0
-        for child in self.children:
-            total_size += child.get_size()
-        return total_size
+        """Total size of directory (cached sum of all descendants)"""
+        return self._size
+
+    def get_file_count(self) -> int:
+        """Number of files anywhere below this directory"""
+        return self._file_count
+
+    def get_directory_count(self) -> int:
+        """Number of directories below this directory (excluding itself)"""
+        return self._dir_count
+
+    def add_observer(self, observer: TreeObserver) -> None:
+        """Notify `observer` of every change to this directory's subtree"""
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(observer)
+
+    def remove_observer(self, observer: TreeObserver) -> None:
+        """Stop notifying a previously added observer"""
+        if not self._observers or observer not in self._observers:
+            raise ValueError("Observer is not registered on this directory")
+        self._observers.remove(observer)
+
+    def top_k_files(self, k: int) -> List[FileSystemComponent]:
+        """The k largest files below this directory, largest first (see top_k.py)"""
+        from top_k import top_k_files
+        return top_k_files(self, k)
+
+    def top_k_dirs(self, k: int) -> List['Directory']:
+        """The k largest directories below this directory, largest first"""
+        from top_k import top_k_dirs
+        return top_k_dirs(self, k)
+
+    def get_file_size_range(self) -> Optional[Tuple[int, int]]:
+        """(smallest, largest) file size below this directory, or None if it has no files"""
+        smallest, largest, _ = self._ensure_query_stats()
+        return None if smallest is None else (smallest, largest)
+
+    def get_extensions(self) -> FrozenSet[str]:
+        """Extensions (see extension_of) of all files below this directory"""
+        return self._ensure_query_stats()[2]
+
+    def _ensure_query_stats(self) -> Tuple[Optional[int], Optional[int], FrozenSet[str]]:
+        """Recompute stale min/max/extension stats bottom-up, without recursion"""
+        stack = [self]
+        while stack:
+            directory = stack[-1]
+            if directory._query_stats is not None:
+                stack.pop()
+                continue
+            stale = [child for child in directory.children
+                     if isinstance(child, Directory) and child._query_stats is None]
+            if stale:
+                stack.extend(stale)
+                continue
+            stack.pop()
+            smallest = largest = None
+            extensions = set()
+            for child in directory.children:
+                if isinstance(child, Directory):
+                    child_min, child_max, child_extensions = child._query_stats
+                    extensions |= child_extensions
+                else:
+                    child_min = child_max = child.get_size()
+                    extensions.add(extension_of(child.name))
+                if child_min is not None:
+                    smallest = child_min if smallest is None else min(smallest, child_min)
+                    largest = child_max if largest is None else max(largest, child_max)
+            directory._query_stats = (smallest, largest, frozenset(extensions))
+        return self._query_stats
+
+    def enable_digests(self) -> None:
+        """Compute Merkle digests for this subtree and keep them current from now on"""
+        directories = [self]
+        i = 0
+        while i < len(directories):
+            directories.extend(child for child in directories[i].children
+                               if isinstance(child, Directory))
+            i += 1
+        for directory in reversed(directories):
+            total = 0
+            for child in directory.children:
+                total += child._digest_term()
+            directory._digest = total & DIGEST_MASK
+            directory._term = directory._compute_term()
+
+    def get_digest(self) -> Optional[str]:
+        """Hex Merkle digest of this subtree, or None if digests are disabled"""
+        if self._digest is None:
+            return None
+        return f"{self._digest:032x}"
+
+    def _compute_term(self) -> int:
+        return digest_term("D", self.name, self._size, self._digest)
+
+    def _digest_term(self) -> int:
+        return self._term
+
+    def _find(self, name: str) -> Optional[FileSystemComponent]:
+        """The child called `name`, or None"""
+        by_name = self._by_name
+        if by_name is not None:
+            position = by_name.get(name)
+            return None if position is None else self._children[position]
+        for child in self._children:
+            if child.name == name:
+                return child
+        return None
+
+    def _compact(self) -> None:
+        """Drop the holes left by remove() and renumber the name map"""
+        children = [child for child in self._children if child is not None]
+        self._children = children
+        self._holes = 0
+        self._by_name = {child.name: i for i, child in enumerate(children)}
+
+    @staticmethod
+    def _rollup_of(component: FileSystemComponent) -> Tuple[int, int, int]:
+        """(size, files, dirs) that a child contributes to its ancestors"""
+        if isinstance(component, Directory):
+            return component._size, component._file_count, component._dir_count + 1
+        return component.get_size(), 1, 0
+
+    def _path_index(self) -> Optional['PathIndex']:
+        """The PathIndex attached to this directory's root, if any"""
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node.path_index
+
+    def _observers_above(self) -> List[TreeObserver]:
+        """Observers registered on this directory or any of its ancestors"""
+        found: List[TreeObserver] = []
+        node = self
+        while node is not None:
+            if node._observers:
+                found.extend(node._observers)
+            node = node.parent
+        return found
+
+    def _propagate(self, size: int, files: int, dirs: int, digest_delta: int = 0) -> None:
+        """Apply a rollup (and digest) delta to this directory and all of its ancestors"""
+        node = self
+        while node is not None:
+            node._size += size
+            node._file_count += files
+            node._dir_count += dirs
+            node._query_stats = None
+            if node._digest is not None:
+                node._digest = (node._digest + digest_delta) & DIGEST_MASK
+                old_term = node._term
+                node._term = node._compute_term()
+                digest_delta = node._term - old_term
+            node = node.parent
@@ -0,0 +1,231 @@
+"""
+DuplicateFinder - Finds duplicate files in a Composite Pattern tree
+Narrows candidates in stages so most files are never read in full.
+
+    1. Group files by size (from the tree, no disk access)
+    2. Hash the first few KB of every file in a size group of two or more
+    3. Fully hash only the files whose size and head hash still collide
+
+Hashing runs in a thread pool (file reads and hashlib release the GIL),
+one task per file and stage, reading into a reused per-thread buffer with
+readinto, so the full hashes of one large size group run side by side.
+Groups are yielded as soon as they are confirmed, largest file size
+first, so a caller can stop early and the remaining work is cancelled.
+
+File nodes do not know where they live on disk, so the finder is given
+the path that corresponds to the root Directory (as passed to DiskScanner).
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from directory import Directory
+
+
+@dataclass
+class DuplicateGroup:
+    """Files with identical content"""
+    size: int          # Size of each file in bytes
+    digest: str        # Hex content hash
+    paths: List[str]   # Relative to the root, '/'-separated
+
+    @property
+    def wasted(self) -> int:
+        """Bytes that would be freed by keeping a single copy"""
+        return self.size * (len(self.paths) - 1)
+
+
+class DuplicateFinder:
+    """Staged, parallel duplicate detection over a Directory/File tree"""
+
+    def __init__(self, root_path: str, max_workers: Optional[int] = None,
+                 head_bytes: int = 4096, buffer_size: int = 1 << 20, min_size: int = 1):
+        """
+        root_path:   on-disk path of the root Directory given to find()
+        max_workers: hashing threads (ThreadPoolExecutor default if None)
+        head_bytes:  bytes hashed in the second stage
+        buffer_size: read buffer per thread for full hashes
+        min_size:    smaller files are ignored (empty files by default)
+        """
+        self.root_path = os.path.abspath(root_path)
+        self.max_workers = max_workers
+        self.head_bytes = head_bytes
+        self.buffer_size = buffer_size
+        self.min_size = min_size
+        self.errors: List[Tuple[str, OSError]] = []
+        self.bytes_read = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def find(self, root: Directory) -> Iterator[DuplicateGroup]:
+        """Yield duplicate groups, largest file size first"""
+        self.errors = []
+        self.bytes_read = 0
+        buckets = self._size_buckets(root)
+        sizes = sorted(buckets, reverse=True)
+        window = max(4, 4 * (self.max_workers or os.cpu_count() or 1))
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for size in sizes:
+                pending.append(self._hash_heads(pool, size, buckets.pop(size)))
+                if len(pending) >= window:
+                    yield from self._resolve_bucket(pool, *pending.popleft())
+            while pending:
+                yield from self._resolve_bucket(pool, *pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _size_buckets(self, root: Directory) -> Dict[int, List[Tuple[str, str]]]:
+        """Stage 1: (directory path, name) of every file, grouped by size"""
+        by_size: Dict[int, List[Tuple[str, str]]] = {}
+        stack = [("", root)]
+        while stack:
+            path, directory = stack.pop()
+            for child in directory.children:
+                if isinstance(child, Directory):
+                    stack.append((f"{path}/{child.name}" if path else child.name, child))
+                    continue
+                size = child.get_size()
+                if size >= self.min_size:
+                    by_size.setdefault(size, []).append((path, child.name))
+        return {size: files for size, files in by_size.items() if len(files) > 1}
+
+    def _hash_heads(self, pool: ThreadPoolExecutor, size: int,
+                    files: List[Tuple[str, str]]) -> Tuple[int, List[Tuple[str, Future]]]:
+        """Stage 2 for one size group: submit a head hash for every file"""
+        paths = [f"{directory}/{name}" if directory else name for directory, name in files]
+        return size, [(path, pool.submit(self._hash, path, self.head_bytes)) for path in paths]
+
+    def _resolve_bucket(self, pool: ThreadPoolExecutor, size: int,
+                        heads: List[Tuple[str, Future]]) -> List[DuplicateGroup]:
+        """Group one size group by head hash, then fully hash every colliding file"""
+        by_head: Dict[bytes, List[str]] = {}
+        for path, future in heads:
+            digest = future.result()
+            if digest is not None:
+                by_head.setdefault(digest, []).append(path)
+
+        groups = []
+        # One full-hash task per candidate, all submitted before any is awaited
+        full_hashes: List[Tuple[str, Future]] = []
+        for head, candidates in by_head.items():
+            if len(candidates) < 2:
+                continue
+            if size <= self.head_bytes:
+                groups.append(DuplicateGroup(size, head.hex(), sorted(candidates)))
+                continue
+            full_hashes.extend((path, pool.submit(self._hash, path, None)) for path in candidates)
+
+        by_content: Dict[bytes, List[str]] = {}
+        for path, future in full_hashes:
+            digest = future.result()
+            if digest is not None:
+                by_content.setdefault(digest, []).append(path)
+        groups.extend(DuplicateGroup(size, digest.hex(), sorted(same))
+                      for digest, same in by_content.items() if len(same) > 1)
+        return groups
+
+    def _hash(self, rel_path: str, limit: Optional[int]) -> Optional[bytes]:
+        """blake2b of the first `limit` bytes (or all) of a file; None on error"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = memoryview(bytearray(max(self.buffer_size, self.head_bytes)))
+        hasher = hashlib.blake2b(digest_size=16)
+        remaining = limit
+        read = 0
+        try:
+            with open(os.path.join(self.root_path, rel_path), "rb", buffering=0) as stream:
+                while remaining is None or remaining > 0:
+                    view = buffer if remaining is None else buffer[:remaining]
+                    count = stream.readinto(view)
+                    if not count:
+                        break
+                    hasher.update(view[:count])
+                    read += count
+                    if remaining is not None:
+                        remaining -= count
+        except OSError as error:
+            with self._lock:
+                self.errors.append((rel_path, error))
+            return None
+        with self._lock:
+            self.bytes_read += read
+        return hasher.digest()
+
+
+def find_duplicates(root: Directory, root_path: str, **options) -> Iterator[DuplicateGroup]:
+    """Convenience wrapper: DuplicateFinder(root_path, **options).find(root)"""
+    return DuplicateFinder(root_path, **options).find(root)
+
+
+def _make_sample_share(path: str) -> None:
+    """Random files, some copied, some sharing a size or a head with others"""
+    import random
+    rng = random.Random(3)
+    originals = []
+    for d in range(20):
+        directory = os.path.join(path, f"album_{d}")
+        os.makedirs(directory)
+        for f in range(25):
+            size = rng.choice([4096, 100_000, 1 << 20]) + rng.randint(0, 3)
+            data = rng.randbytes(size)
+            file_path = os.path.join(directory, f"track_{f}.flac")
+            with open(file_path, "wb") as stream:
+                stream.write(data)
+            originals.append(data)
+    copies = os.path.join(path, "backup")
+    os.makedirs(copies)
+    for i, data in enumerate(rng.sample(originals, 40)):
+        with open(os.path.join(copies, f"copy_{i}.flac"), "wb") as stream:
+            stream.write(data)
+        # Same size and head as the copy, different tail
+        with open(os.path.join(copies, f"edit_{i}.flac"), "wb") as stream:
+            stream.write(data[:-1] + bytes([data[-1] ^ 1]))
+
+
+def main():
+    """Find duplicates under a path (default: a generated sample share)"""
+    from disk_scanner import DiskScanner
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - STAGED DUPLICATE FINDER")
+    print("=" * 70)
+    print()
+
+    with tempfile.TemporaryDirectory() as sample:
+        path = sys.argv[1] if len(sys.argv) > 1 else sample
+        if len(sys.argv) <= 1:
+            _make_sample_share(sample)
+        root = DiskScanner().scan(path)
+        total = root.get_size()
+        print(f"Path: {os.path.abspath(path)}")
+        print(f"Tree: {root.get_file_count():,} files, {total:,} bytes")
+        print()
+
+        finder = DuplicateFinder(path)
+        start = time.perf_counter()
+        groups = 0
+        wasted = 0
+        for group in finder.find(root):
+            groups += 1
+            wasted += group.wasted
+            if groups <= 5:
+                print(f"   {group.size:>12,} B x {len(group.paths)}  {', '.join(group.paths[:3])}")
+        elapsed = time.perf_counter() - start
+        print()
+        print(f"Duplicate groups: {groups:,}, wasted {wasted:,} bytes")
+        print(f"Bytes read:       {finder.bytes_read:,} ({finder.bytes_read / max(1, total):.0%} of the tree)")
+        print(f"Time:             {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
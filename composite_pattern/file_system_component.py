@@ -1,16 +1,47 @@
 """
 FileSystemComponent - Abstract Component for Composite Pattern
 Defines the interface for objects in the composition.
+
+Components use __slots__ instead of a per-instance __dict__. Names can be
+interned (INTERN_NAMES) so that names repeated across directories
+("index.html", "__init__.py", ...) share one string; this is off by
+default because for mostly unique names the intern table costs more than
+it saves. See memory_benchmark.py.
 """
 
+import hashlib
+import sys
 from abc import ABC, abstractmethod
+from typing import Iterator, Optional
+
+
+DIGEST_BITS = 128
+DIGEST_MASK = (1 << DIGEST_BITS) - 1
+
+
+def digest_term(kind: str, name: str, size: int, digest: int = 0) -> int:
+    """Hash of one entry; a directory's digest is the sum of its children's terms"""
+    data = f"{kind}\0{name}\0{size}\0{digest:x}".encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=DIGEST_BITS // 8).digest(), "little")
+
+
+def extension_of(name: str) -> str:
+    """Suffix from the last '.' of a name: "a.tar.gz" -> ".gz", ".bashrc" -> ".bashrc", "README" -> ''"""
+    dot = name.rfind(".")
+    return name[dot:] if dot >= 0 else ""
 
 
 class FileSystemComponent(ABC):
     """Abstract component representing file system elements"""
-    
+
+    __slots__ = ("name", "parent")
+
+    # Set to True before building trees whose names repeat a lot
+    INTERN_NAMES = False
+
     def __init__(self, name: str):
-        self.name = name
+        self.name = sys.intern(name) if self.INTERN_NAMES else name
+        self.parent: Optional['FileSystemComponent'] = None
     
     @abstractmethod
     def display(self, indent: int = 0) -> None:
@@ -33,3 +64,12 @@ class FileSystemComponent(ABC):
     def get_child(self, index: int) -> 'FileSystemComponent':
         """Get a child component (only valid for composites)"""
         raise NotImplementedError("Leaf has no children")
+
+    def query(self, **criteria) -> Iterator['FileSystemComponent']:
+        """Lazily yield matching descendants; see TreeQuery in tree_query.py"""
+        from tree_query import TreeQuery
+        return TreeQuery(**criteria).run(self)
+
+    def _digest_term(self) -> int:
+        """Contribution of this component to its parent's Merkle digest"""
+        return digest_term("F", self.name, self.get_size())
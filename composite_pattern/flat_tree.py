@@ -0,0 +1,238 @@
+"""
+FlatTree - Columnar tree engine for Composite Pattern
+Stores a whole file system hierarchy as parallel NumPy arrays instead of
+one Python object per File/Directory.
+
+Nodes are numbered in breadth-first order (the root is node 0), so the
+children of node i are the contiguous range
+child_offsets[i] .. child_offsets[i + 1] (CSR layout with an implicit
+child index array), and every BFS level is a contiguous slice. Names are
+UTF-8 encoded into one bytes blob addressed by name_offsets.
+
+Size rollups are computed in one vectorized bottom-up pass, one
+np.add.reduceat per level. FlatNode wraps an index in the
+FileSystemComponent interface so client code can use a FlatTree like any
+other composite tree.
+"""
+
+from typing import Iterator, List, Optional
+
+import numpy as np
+
+from file_system_component import FileSystemComponent
+from file import File
+from directory import Directory
+
+
+class FlatTree:
+    """Read-only, array-backed file system tree (nodes in BFS order)"""
+
+    # Columns of the rollup table
+    SIZE, FILES, DIRS = 0, 1, 2
+
+    def __init__(self, child_offsets: np.ndarray, sizes: np.ndarray, is_dir: np.ndarray,
+                 name_offsets: np.ndarray, names_blob: bytes):
+        """
+        child_offsets: int64[n + 1], children of i are child_offsets[i]:child_offsets[i + 1]
+        sizes:         int64[n], own size of each node (0 for directories)
+        is_dir:        bool[n]
+        name_offsets:  int64[n + 1], name of i is names_blob[name_offsets[i]:name_offsets[i + 1]]
+        """
+        self.child_offsets = np.asarray(child_offsets, dtype=np.int64)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.is_dir = np.asarray(is_dir, dtype=np.bool_)
+        self.name_offsets = np.asarray(name_offsets, dtype=np.int64)
+        self.names_blob = names_blob
+
+        n = len(self.sizes)
+        if n == 0:
+            raise ValueError("FlatTree needs at least a root node")
+        child_count = np.diff(self.child_offsets)
+        self.parent = np.repeat(np.arange(n, dtype=np.int64), child_count)
+        self.parent = np.concatenate(([-1], self.parent))
+        if len(self.parent) != n:
+            raise ValueError("child_offsets do not describe a tree of len(sizes) nodes")
+
+        self.level_offsets = self._compute_levels()
+        self.rollups = self._compute_rollups()
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _compute_levels(self) -> np.ndarray:
+        """Boundaries of the BFS levels: level k is level_offsets[k]:level_offsets[k + 1]"""
+        n = len(self.sizes)
+        offsets = [0, 1]
+        while offsets[-1] < n:
+            # Children of the current level form exactly the next level
+            offsets.append(int(self.child_offsets[offsets[-1]]))
+            if offsets[-1] == offsets[-2]:
+                raise ValueError("child_offsets are not in breadth-first order")
+        return np.array(offsets, dtype=np.int64)
+
+    def _compute_rollups(self) -> np.ndarray:
+        """Per-node (size, files, dirs) of each subtree, in one bottom-up pass"""
+        rollups = np.zeros((len(self.sizes), 3), dtype=np.int64)
+        rollups[:, self.SIZE] = self.sizes
+        rollups[:, self.FILES] = ~self.is_dir
+        rollups[:, self.DIRS] = self.is_dir  # Counts the node itself for now
+
+        levels = self.level_offsets
+        for k in range(len(levels) - 2, 0, -1):
+            lo, hi = levels[k], levels[k + 1]
+            parent_lo, parent_hi = levels[k - 1], levels[k]
+            starts = self.child_offsets[parent_lo:parent_hi]
+            has_children = np.diff(self.child_offsets[parent_lo:parent_hi + 1]) > 0
+            sums = np.add.reduceat(rollups[lo:hi], starts[has_children] - lo, axis=0)
+            rollups[parent_lo:parent_hi][has_children] += sums
+
+        rollups[:, self.DIRS] -= self.is_dir  # Exclude the node itself
+        return rollups
+
+    @classmethod
+    def from_component(cls, root: FileSystemComponent) -> 'FlatTree':
+        """Convert a Directory/File tree into a FlatTree"""
+        order: List[FileSystemComponent] = [root]
+        child_counts: List[int] = []
+        i = 0
+        while i < len(order):
+            node = order[i]
+            if isinstance(node, Directory):
+                order.extend(node.children)
+                child_counts.append(len(node.children))
+            else:
+                child_counts.append(0)
+            i += 1
+
+        encoded = [node.name.encode() for node in order]
+        name_offsets = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=name_offsets[1:])
+        child_offsets = np.empty(len(order) + 1, dtype=np.int64)
+        child_offsets[0] = 1
+        np.cumsum(child_counts, out=child_offsets[1:])
+        child_offsets[1:] += 1
+        is_dir = np.fromiter((isinstance(node, Directory) for node in order),
+                             dtype=np.bool_, count=len(order))
+        sizes = np.fromiter((0 if isinstance(node, Directory) else node.get_size()
+                             for node in order), dtype=np.int64, count=len(order))
+        return cls(child_offsets, sizes, is_dir, name_offsets, b"".join(encoded))
+
+    def to_component(self) -> Directory:
+        """Rebuild an equivalent Directory/File object tree"""
+        n = len(self)
+        nodes: List[FileSystemComponent] = [
+            Directory(self.name(i)) if self.is_dir[i] else File(self.name(i), int(self.sizes[i]))
+            for i in range(n)
+        ]
+        # Attach children deepest-first: each parent is still detached when it
+        # receives its children, so the rollup delta stops at the parent.
+        offsets = self.child_offsets.tolist()
+        for i in range(n - 1, -1, -1):
+            if offsets[i] < offsets[i + 1]:
+                nodes[i].add_all(nodes[offsets[i]:offsets[i + 1]])
+        return nodes[0]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def root(self) -> 'FlatNode':
+        """Component view of the root node"""
+        return FlatNode(self, 0)
+
+    def name(self, index: int) -> str:
+        return self.names_blob[self.name_offsets[index]:self.name_offsets[index + 1]].decode()
+
+    def children(self, index: int) -> range:
+        return range(int(self.child_offsets[index]), int(self.child_offsets[index + 1]))
+
+    def get_size(self, index: int = 0) -> int:
+        return int(self.rollups[index, self.SIZE])
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays and the name blob"""
+        arrays = (self.child_offsets, self.sizes, self.is_dir, self.name_offsets,
+                  self.parent, self.level_offsets, self.rollups)
+        return sum(array.nbytes for array in arrays) + len(self.names_blob)
+
+
+class FlatNode(FileSystemComponent):
+    """FileSystemComponent view of one node of a FlatTree"""
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: FlatTree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def name(self) -> str:
+        return self.tree.name(self.index)
+
+    @property
+    def parent(self) -> Optional['FlatNode']:
+        parent = int(self.tree.parent[self.index])
+        return FlatNode(self.tree, parent) if parent >= 0 else None
+
+    @property
+    def children(self) -> List['FlatNode']:
+        return [FlatNode(self.tree, i) for i in self.tree.children(self.index)]
+
+    def is_directory(self) -> bool:
+        return bool(self.tree.is_dir[self.index])
+
+    def get_size(self) -> int:
+        return self.tree.get_size(self.index)
+
+    def get_file_count(self) -> int:
+        return int(self.tree.rollups[self.index, FlatTree.FILES])
+
+    def get_directory_count(self) -> int:
+        return int(self.tree.rollups[self.index, FlatTree.DIRS])
+
+    def get_child(self, index: int) -> 'FlatNode':
+        if not self.is_directory():
+            return super().get_child(index)
+        return self.children[index]
+
+    def add(self, component: FileSystemComponent) -> None:
+        if not self.is_directory():
+            return super().add(component)
+        raise NotImplementedError("FlatTree is read-only")
+
+    def remove(self, component: FileSystemComponent) -> None:
+        if not self.is_directory():
+            return super().remove(component)
+        raise NotImplementedError("FlatTree is read-only")
+
+    def walk(self) -> Iterator['FlatNode']:
+        """Yield this node and its descendants in preorder, without recursion"""
+        tree = self.tree
+        stack = [self.index]
+        while stack:
+            index = stack.pop()
+            yield FlatNode(tree, index)
+            stack.extend(reversed(tree.children(index)))
+
+    def display(self, indent: int = 0) -> None:
+        """Display in the same format as Directory/File"""
+        tree = self.tree
+        stack = [(self.index, indent)]
+        while stack:
+            index, level = stack.pop()
+            if tree.is_dir[index]:
+                print(f"{'  ' * level}📁 {tree.name(index)}/")
+                stack.extend((child, level + 1) for child in reversed(tree.children(index)))
+            else:
+                print(" " * level + f"- {tree.name(index)} ({int(tree.sizes[index])} KB)")
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FlatNode) and other.tree is self.tree and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
@@ -0,0 +1,97 @@
+"""
+FlatTree Benchmark for Composite Pattern
+Compares memory and rollup speed of FlatTree against Directory/File objects.
+
+Usage: python flat_tree_benchmark.py [node counts...] [--max-object-nodes N]
+Object trees above N nodes (default 2,000,000) are skipped and their
+memory is extrapolated from the largest measured size.
+"""
+
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from flat_tree import FlatTree
+from rollup_benchmark import uncached_size
+
+
+def synthetic_flat_tree(n: int, fanout: int = 10, seed: int = 0) -> FlatTree:
+    """Complete `fanout`-ary tree of n nodes: inner nodes are dirs, leaves are files"""
+    index = np.arange(n + 1, dtype=np.int64)
+    child_offsets = np.minimum(index * fanout + 1, n)
+    child_offsets[0] = 1
+    is_dir = np.diff(child_offsets) > 0
+    rng = np.random.default_rng(seed)
+    sizes = np.where(is_dir, 0, rng.integers(1, 10_000, size=n))
+    names = [str(i) for i in range(n)]
+    name_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, names), dtype=np.int64, count=n), out=name_offsets[1:])
+    return FlatTree(child_offsets, sizes, is_dir, name_offsets, "".join(names).encode())
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _traced(func):
+    tracemalloc.start()
+    result = func()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, used
+
+
+def benchmark(n: int, max_object_nodes: int, bytes_per_object_node: list) -> None:
+    """Report memory and whole-tree rollup time for one tree size"""
+    print(f"{n:,} nodes")
+    flat, build_time = _timed(lambda: synthetic_flat_tree(n))
+    _, rollup_time = _timed(flat._compute_rollups)
+    print(f"   FlatTree       {flat.nbytes / n:8.1f} B/node  {flat.nbytes / 2**20:9.1f} MiB"
+          f"   rollup pass {rollup_time * 1e3:9.1f} ms   (build {build_time:.2f} s)")
+
+    if n > max_object_nodes:
+        if bytes_per_object_node:
+            estimate = bytes_per_object_node[-1] * n
+            print(f"   Objects        {bytes_per_object_node[-1]:8.1f} B/node  "
+                  f"{estimate / 2**20:9.1f} MiB   (extrapolated, not built)")
+        print()
+        return
+
+    (root, used), convert_time = _timed(lambda: _traced(flat.to_component))
+    bytes_per_object_node.append(used / n)
+    total, walk_time = _timed(lambda: uncached_size(root))
+    assert total == flat.get_size() == root.get_size()
+    print(f"   Objects        {used / n:8.1f} B/node  {used / 2**20:9.1f} MiB"
+          f"   full walk   {walk_time * 1e3:9.1f} ms   (to_component {convert_time:.2f} s)")
+    print(f"   Memory ratio   {used / flat.nbytes:8.1f}x   rollup speedup {walk_time / rollup_time:,.1f}x")
+    del root
+    _, from_time = _timed(lambda: FlatTree.from_component(flat.to_component()))
+    print(f"   to_component + from_component round trip {from_time:.2f} s")
+    print()
+
+
+def main():
+    """Compare FlatTree and object trees at 10^6 and 10^7 nodes"""
+    args = sys.argv[1:]
+    max_object_nodes = 2_000_000
+    if "--max-object-nodes" in args:
+        position = args.index("--max-object-nodes")
+        max_object_nodes = int(args[position + 1])
+        del args[position:position + 2]
+    sizes = [int(arg) for arg in args] or [10**6, 10**7]
+
+    print("=" * 80)
+    print("COMPOSITE PATTERN - FLATTREE VS OBJECT TREE")
+    print("=" * 80)
+    print()
+    bytes_per_object_node: list = []
+    for n in sizes:
+        benchmark(n, max_object_nodes, bytes_per_object_node)
+
+
+if __name__ == "__main__":
+    main()
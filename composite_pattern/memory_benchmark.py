@@ -0,0 +1,135 @@
+"""
+Memory Benchmark for Composite Pattern
+Measures bytes per node of Directory/File trees with tracemalloc.
+
+The baseline reproduces the earlier node layout: a per-instance __dict__,
+a child list and a name dict in every directory, and one string object per
+name. The current classes use __slots__, no container in empty
+directories and a name dict only in large ones, optionally with interned
+names.
+
+Each layout is measured on two name distributions: unique names, as on a
+real disk, and names that repeat across directories (file_0.dat ..
+file_9.dat in every directory). Interning only pays off on the second;
+on unique names each intern table entry adds about 30 bytes per node.
+
+Usage: python memory_benchmark.py [levels]
+"""
+
+import gc
+import sys
+import tracemalloc
+from typing import Callable, Tuple
+
+from file import File
+from directory import Directory
+from file_system_component import FileSystemComponent
+
+
+class _DictFile:
+    """Pre-slots File layout"""
+
+    def __init__(self, name: str, size: int):
+        self._name = name
+        self._size = size
+        self.parent = None
+
+
+class _DictDirectory:
+    """Pre-slots Directory layout"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.parent = None
+        self.children = []
+        self._by_name = {}
+        self._size = 0
+        self._file_count = 0
+        self._dir_count = 0
+        self._digest = None
+        self._term = 0
+        self._query_stats = None
+        self.path_index = None
+        self._observers = None
+
+    def add_all(self, components) -> None:
+        for component in components:
+            self.children.append(component)
+            self._by_name[component._name if isinstance(component, _DictFile)
+                          else component.name] = component
+            component.parent = self
+
+
+def build_tree(file_class: Callable, directory_class: Callable, fanout: int, levels: int,
+               files_per_dir: int, unique_names: bool) -> Tuple[object, int]:
+    """Same shape as synthetic_trees.build_wide_tree; returns (root, node count)"""
+    root = directory_class("root")
+    nodes = 1
+    frontier = [root]
+    for level in range(levels):
+        next_frontier = []
+        for directory in frontier:
+            # Fresh name strings per node, as os.scandir would produce them
+            tag = f"{nodes:x}_" if unique_names else ""
+            children = [file_class(f"file_{tag}{i}.dat", 1000 + i) for i in range(files_per_dir)]
+            if level < levels - 1:
+                subdirectories = [directory_class(f"dir_{tag}{level}_{i}") for i in range(fanout)]
+                children.extend(subdirectories)
+                next_frontier.extend(subdirectories)
+            directory.add_all(children)
+            nodes += len(children)
+        frontier = next_frontier
+    return root, nodes
+
+
+def measure(file_class: Callable, directory_class: Callable, shape: Tuple[int, int, int],
+            unique_names: bool, intern_names: bool = False) -> Tuple[float, int]:
+    """(bytes per node, node count) for one node model"""
+    gc.collect()
+    FileSystemComponent.INTERN_NAMES = intern_names
+    tracemalloc.start()
+    try:
+        root, nodes = build_tree(file_class, directory_class, *shape, unique_names)
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        FileSystemComponent.INTERN_NAMES = False
+    del root
+    return current / nodes, nodes
+
+
+def main():
+    """Compare bytes per node of the slotted model and the old layout"""
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - MEMORY PER NODE (tracemalloc)")
+    print("=" * 70)
+    print()
+
+    shape = (10, levels, 10)  # fanout, levels, files per directory
+    models = [
+        ("__dict__ nodes (before)", _DictFile, _DictDirectory, False),
+        ("slotted nodes", File, Directory, False),
+        ("slotted, interned names", File, Directory, True),
+    ]
+    for unique_names in (True, False):
+        label = "unique names" if unique_names else "names repeated across directories"
+        results = []
+        for name, file_class, directory_class, intern_names in models:
+            per_node, nodes = measure(file_class, directory_class, shape, unique_names, intern_names)
+            results.append((name, per_node))
+        print(f"Tree: {nodes:,} nodes (fanout {shape[0]}, {shape[1]} levels, "
+              f"{shape[2]} files per directory), {label}")
+        print(f"   {'model':28} {'bytes/node':>11} {'total MiB':>10} {'reduction':>10}")
+        baseline = results[0][1]
+        for name, per_node in results:
+            print(f"   {name:28} {per_node:11.1f} {per_node * nodes / 2**20:10.1f}"
+                  f" {baseline / per_node:9.2f}x")
+        print()
+    print(f"sys.getsizeof: File {sys.getsizeof(File('a', 1))} B, "
+          f"empty Directory {sys.getsizeof(Directory('a'))} B")
+
+
+if __name__ == "__main__":
+    main()
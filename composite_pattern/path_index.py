@@ -0,0 +1,116 @@
+"""
+PathIndex - Full-path index over a Composite Pattern tree
+Maps every path below a root Directory to its component, so lookup,
+remove and rename by full path are dictionary operations.
+
+Paths are '/'-separated and relative to the root, which is not part of
+the path: "projects/website_redesign/images/logo.png". The index attaches
+itself to the root directory; Directory.add/add_all/remove/rename anywhere
+below that root update it, so it never needs a rescan.
+"""
+
+from typing import Dict, Iterator
+
+from file_system_component import FileSystemComponent
+from directory import Directory
+
+
+class PathIndex:
+    """Dictionary from full path to component, kept in sync with the tree"""
+
+    SEPARATOR = "/"
+
+    def __init__(self, root: Directory):
+        if root.parent is not None:
+            raise ValueError("PathIndex must be attached to a root directory")
+        if root.path_index is not None:
+            raise ValueError(f"'{root.name}' already has a PathIndex")
+        self.root = root
+        self._paths: Dict[str, FileSystemComponent] = {}
+        for child in root.children:
+            self._index_subtree(child)
+        root.path_index = self
+
+    def detach(self) -> None:
+        """Stop tracking the tree and release the index"""
+        self.root.path_index = None
+        self._paths.clear()
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: str) -> bool:
+        """True for every path lookup() resolves, including the empty path (the root)"""
+        path = self._normalize(path)
+        return not path or path in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def lookup(self, path: str) -> FileSystemComponent:
+        """Component at `path` in O(1); the empty path is the root"""
+        path = self._normalize(path)
+        if not path:
+            return self.root
+        try:
+            return self._paths[path]
+        except KeyError:
+            raise KeyError(f"No such path: '{path}'") from None
+
+    def add(self, directory_path: str, component: FileSystemComponent) -> None:
+        """Add a component to the directory at `directory_path`"""
+        directory = self.lookup(directory_path)
+        if not isinstance(directory, Directory):
+            raise NotADirectoryError(f"'{directory_path}' is not a directory")
+        directory.add(component)
+
+    def remove(self, path: str) -> FileSystemComponent:
+        """Remove and return the component at `path`"""
+        component = self.lookup(path)
+        if component is self.root:
+            raise ValueError("Cannot remove the root directory")
+        component.parent.remove(component)
+        return component
+
+    def rename(self, path: str, new_name: str) -> None:
+        """Rename the component at `path`; its descendants are re-keyed"""
+        if self.SEPARATOR in new_name:
+            raise ValueError(f"Name cannot contain '{self.SEPARATOR}': {new_name!r}")
+        component = self.lookup(path)
+        if component is self.root:
+            raise ValueError("Cannot rename the root directory")
+        component.parent.rename(component.name, new_name)
+
+    def path_of(self, component: FileSystemComponent) -> str:
+        """Full path of a component below the root (O(depth))"""
+        parts = []
+        node = component
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        if node is not self.root:
+            raise ValueError(f"'{component.name}' is not in this tree")
+        return self.SEPARATOR.join(reversed(parts))
+
+    def _normalize(self, path: str) -> str:
+        return path.strip(self.SEPARATOR)
+
+    def _index_subtree(self, component: FileSystemComponent) -> None:
+        """Add paths for an attached component and all of its descendants"""
+        stack = [(component, self.path_of(component))]
+        while stack:
+            node, path = stack.pop()
+            self._paths[path] = node
+            if isinstance(node, Directory):
+                stack.extend((child, f"{path}{self.SEPARATOR}{child.name}")
+                             for child in node.children)
+
+    def _unindex_subtree(self, component: FileSystemComponent) -> None:
+        """Drop paths for a still-attached component and all of its descendants"""
+        stack = [(component, self.path_of(component))]
+        while stack:
+            node, path = stack.pop()
+            self._paths.pop(path, None)
+            if isinstance(node, Directory):
+                stack.extend((child, f"{path}{self.SEPARATOR}{child.name}")
+                             for child in node.children)
@@ -0,0 +1,389 @@
+"""
+Persistent Binary Search Tree built on the Binary Tree Composite
+Immutable AVL tree versions for lock-free readers.
+
+PersistentNodes never change after construction. insert and delete copy
+only the O(log n) nodes on the root-to-key path (plus the few a rotation
+touches) and return a new PersistentTree that shares every other node
+with the old version:
+
+    v1 = PersistentTree([50, 20, 80])
+    v2 = v1.insert(65)      # v1 still holds 20, 50, 80
+    v2.rank(65)             # 2
+
+Nodes have no parent links, so versions form no reference cycles: a
+version's unshared nodes are freed by reference counting as soon as the
+last reader drops it.
+
+SharedTree publishes versions for concurrent use. Writers take a lock,
+build the next version and publish it with a single reference
+assignment; readers call snapshot() without locking and see one
+complete, unchanging version for as long as they hold it.
+
+Usage: python persistent_tree.py [keys] [reader threads] [seconds per run]
+"""
+
+import random
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from balanced_tree import OrderStatisticTree
+from binary_tree_composite import BinaryNode
+
+
+class PersistentNode(BinaryNode):
+    """Immutable BinaryNode caching its subtree's height and node count"""
+
+    def __init__(self, value, left: Optional['PersistentNode'] = None,
+                 right: Optional['PersistentNode'] = None):
+        # Written through __dict__ because __setattr__ refuses all changes;
+        # the helpers are inlined since every update builds ~2 log n nodes
+        left_height = left._height if left is not None else -1
+        right_height = right._height if right is not None else -1
+        fields = self.__dict__
+        fields["value"] = value
+        fields["left"] = left
+        fields["right"] = right
+        fields["_height"] = 1 + (left_height if left_height > right_height else right_height)
+        fields["_count"] = (1 + (left._count if left is not None else 0)
+                            + (right._count if right is not None else 0))
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("PersistentNode is immutable")
+
+    def set_left(self, node) -> None:
+        raise TypeError("PersistentNode is immutable; use PersistentTree.insert/delete")
+
+    def set_right(self, node) -> None:
+        raise TypeError("PersistentNode is immutable; use PersistentTree.insert/delete")
+
+    def get_height(self) -> int:
+        """Height of this subtree in O(1)"""
+        return self._height
+
+    def count_nodes(self) -> int:
+        """Nodes in this subtree in O(1)"""
+        return self._count
+
+
+def _height(node: Optional[PersistentNode]) -> int:
+    return node._height if node is not None else -1
+
+
+def _count(node: Optional[PersistentNode]) -> int:
+    return node._count if node is not None else 0
+
+
+def _balance(value, left: Optional[PersistentNode], right: Optional[PersistentNode]) -> PersistentNode:
+    """New node over two AVL subtrees whose heights differ by at most 2, rotating if needed"""
+    left_height, right_height = _height(left), _height(right)
+    if left_height > right_height + 1:
+        if _height(left.left) >= _height(left.right):
+            return PersistentNode(left.value, left.left, PersistentNode(value, left.right, right))
+        pivot = left.right
+        return PersistentNode(pivot.value, PersistentNode(left.value, left.left, pivot.left),
+                              PersistentNode(value, pivot.right, right))
+    if right_height > left_height + 1:
+        if _height(right.right) >= _height(right.left):
+            return PersistentNode(right.value, PersistentNode(value, left, right.left), right.right)
+        pivot = right.left
+        return PersistentNode(pivot.value, PersistentNode(value, left, pivot.left),
+                              PersistentNode(right.value, pivot.right, right.right))
+    return PersistentNode(value, left, right)
+
+
+def _rebuild(path: List[PersistentNode], went_left: List[bool],
+             subtree: Optional[PersistentNode]) -> Optional[PersistentNode]:
+    """Copy the nodes on a search path bottom-up around a replaced subtree"""
+    for node, is_left in zip(reversed(path), reversed(went_left)):
+        if is_left:
+            subtree = _balance(node.value, subtree, node.right)
+        else:
+            subtree = _balance(node.value, node.left, subtree)
+    return subtree
+
+
+def _build(keys: List, lo: int, hi: int) -> Optional[PersistentNode]:
+    """Balanced subtree over keys[lo:hi] (recursion depth is only log2 n)"""
+    if lo >= hi:
+        return None
+    mid = (lo + hi) // 2
+    return PersistentNode(keys[mid], _build(keys, lo, mid), _build(keys, mid + 1, hi))
+
+
+class PersistentTree:
+    """One immutable version of a sorted set; updates return new versions"""
+
+    __slots__ = ("root",)
+
+    def __init__(self, keys: Iterable = (), *, root: Optional[PersistentNode] = None):
+        if root is None:
+            keys = sorted(set(keys))
+            root = _build(keys, 0, len(keys))
+        object.__setattr__(self, "root", root)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError("PersistentTree is immutable")
+
+    def __len__(self) -> int:
+        return _count(self.root)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.contains(key)
+
+    def __iter__(self) -> Iterator:
+        """Keys in ascending order"""
+        return self.root.iter_inorder() if self.root is not None else iter(())
+
+    def contains(self, key: Any) -> bool:
+        """O(log n) membership test"""
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return True
+            node = node.left if key < node.value else node.right
+        return False
+
+    def insert(self, key: Any) -> 'PersistentTree':
+        """Version with `key` added in O(log n); self if it is already present"""
+        path: List[PersistentNode] = []
+        went_left: List[bool] = []
+        node = self.root
+        while node is not None:
+            if key == node.value:
+                return self
+            path.append(node)
+            went_left.append(key < node.value)
+            node = node.left if went_left[-1] else node.right
+        return PersistentTree(root=_rebuild(path, went_left, PersistentNode(key)))
+
+    def delete(self, key: Any) -> 'PersistentTree':
+        """Version without `key` in O(log n); raises KeyError if it is absent"""
+        path: List[PersistentNode] = []
+        went_left: List[bool] = []
+        node = self.root
+        while node is not None and key != node.value:
+            path.append(node)
+            went_left.append(key < node.value)
+            node = node.left if went_left[-1] else node.right
+        if node is None:
+            raise KeyError(key)
+
+        if node.left is None or node.right is None:
+            replacement = node.left if node.left is not None else node.right
+        else:
+            # Replace the key with its successor, removed from the right subtree
+            right_path: List[PersistentNode] = []
+            successor = node.right
+            while successor.left is not None:
+                right_path.append(successor)
+                successor = successor.left
+            right = _rebuild(right_path, [True] * len(right_path), successor.right)
+            replacement = _balance(successor.value, node.left, right)
+        return PersistentTree(root=_rebuild(path, went_left, replacement))
+
+    def discard(self, key: Any) -> 'PersistentTree':
+        """Version without `key`; self if it is absent"""
+        return self.delete(key) if key in self else self
+
+    def kth_smallest(self, k: int):
+        """The k-th smallest key (k = 1 is the minimum); raises IndexError"""
+        if not 1 <= k <= len(self):
+            raise IndexError(f"k must be between 1 and {len(self)}")
+        node = self.root
+        while True:
+            left_count = _count(node.left)
+            if k <= left_count:
+                node = node.left
+            elif k == left_count + 1:
+                return node.value
+            else:
+                k -= left_count + 1
+                node = node.right
+
+    def rank(self, key) -> int:
+        """Number of keys smaller than `key`"""
+        rank = 0
+        node = self.root
+        while node is not None:
+            if node.value < key:
+                rank += _count(node.left) + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def height(self) -> int:
+        """Height of the tree (-1 when empty), in O(1)"""
+        return _height(self.root)
+
+    def display(self) -> str:
+        return self.root.display() if self.root is not None else "∅"
+
+
+class SharedTree:
+    """
+    Latest PersistentTree version shared between threads
+
+    snapshot() is a plain attribute read, so readers never block and never
+    observe a half-applied update. Writers are serialized by a lock.
+    """
+
+    def __init__(self, keys: Iterable = ()):
+        self._current = PersistentTree(keys)
+        self._write_lock = threading.Lock()
+        self.version = 0
+
+    def snapshot(self) -> PersistentTree:
+        """The current version; it stays valid and unchanged while held"""
+        return self._current
+
+    def update(self, change: Callable[[PersistentTree], PersistentTree]) -> PersistentTree:
+        """Apply change(current) under the writer lock and publish its result"""
+        with self._write_lock:
+            new = change(self._current)
+            if new is not self._current:
+                self._current = new
+                self.version += 1
+            return new
+
+    def insert(self, key: Any) -> PersistentTree:
+        return self.update(lambda tree: tree.insert(key))
+
+    def delete(self, key: Any) -> PersistentTree:
+        return self.update(lambda tree: tree.delete(key))
+
+    def discard(self, key: Any) -> PersistentTree:
+        return self.update(lambda tree: tree.discard(key))
+
+
+def _check(tree: PersistentTree) -> None:
+    """Assert the BST order, cached fields and AVL balance of every node"""
+    keys = list(tree)
+    assert keys == sorted(set(keys)) and len(keys) == len(tree)
+    stack = [tree.root] if tree.root is not None else []
+    while stack:
+        node = stack.pop()
+        assert node._height == 1 + max(_height(node.left), _height(node.right))
+        assert node._count == 1 + _count(node.left) + _count(node.right)
+        assert abs(_height(node.left) - _height(node.right)) <= 1
+        stack.extend(child for child in (node.left, node.right) if child is not None)
+
+
+def _run(readers: int, seconds: float, read: Callable[[random.Random], None],
+         write: Optional[Callable[[random.Random], None]]) -> tuple:
+    """Reads/s summed over reader threads, and writes/s, for `seconds`"""
+    stop = threading.Event()
+    reads = [0] * readers
+    writes = [0]
+
+    def reader(slot: int) -> None:
+        rng = random.Random(slot)
+        while not stop.is_set():
+            for _ in range(100):
+                read(rng)
+            reads[slot] += 100
+
+    def writer() -> None:
+        rng = random.Random(-1)
+        while not stop.is_set():
+            write(rng)
+            writes[0] += 1
+
+    threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(readers)]
+    if write is not None:
+        threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(reads) / seconds, writes[0] / seconds
+
+
+def main():
+    """Compare read throughput of lock-free snapshots and a locked mutable tree"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+
+    print("=" * 80)
+    print("BINARY TREE COMPOSITE - PERSISTENT TREE VERSIONS")
+    print("=" * 80)
+    print()
+    v1 = PersistentTree([50, 20, 80, 10, 30])
+    v2 = v1.insert(65)
+    v3 = v2.delete(20)
+    for version in (v1, v2, v3):
+        _check(version)
+    print(v2.display())
+    print(f"v1 {list(v1)}, v2 {list(v2)}, v3 {list(v3)}")
+    print(f"v2 shares v1's left subtree: {v2.root.left is v1.root.left}")
+    print()
+
+    rng = random.Random(3)
+    keys = rng.sample(range(n * 10), n)
+    shared = SharedTree(keys)
+    first = weakref.ref(shared.snapshot().root)
+    locked = OrderStatisticTree(keys)
+    lock = threading.Lock()
+
+    def snapshot_read(rng: random.Random) -> None:
+        # Two queries on one snapshot must agree with each other
+        tree = shared.snapshot()
+        k = rng.randrange(1, len(tree) + 1)
+        assert tree.rank(tree.kth_smallest(k)) == k - 1
+
+    def replace_random_key(tree: PersistentTree, rng: random.Random) -> PersistentTree:
+        victim = tree.kth_smallest(rng.randrange(1, len(tree) + 1))
+        return tree.delete(victim).insert(rng.randrange(n * 10))
+
+    def snapshot_writer(batch: int) -> Callable[[random.Random], None]:
+        def write(rng: random.Random) -> None:
+            def change(tree: PersistentTree) -> PersistentTree:
+                for _ in range(batch):
+                    tree = replace_random_key(tree, rng)
+                return tree
+            shared.update(change)
+        return write
+
+    def locked_read(rng: random.Random) -> None:
+        with lock:
+            k = rng.randrange(1, len(locked) + 1)
+            assert locked.rank(locked.kth_smallest(k)) == k - 1
+
+    def locked_writer(batch: int) -> Callable[[random.Random], None]:
+        def write(rng: random.Random) -> None:
+            with lock:
+                for _ in range(batch):
+                    locked.delete(locked.kth_smallest(rng.randrange(1, len(locked) + 1)))
+                    locked.insert(rng.randrange(n * 10))
+        return write
+
+    print(f"{n:,} keys, {readers} reader threads, {seconds:g} s per run "
+          "(each read is a kth_smallest + rank pair)")
+    print()
+    print(f"   {'':46} {'reads/s':>10} {'updates/s':>10}")
+    runs = [
+        ("persistent snapshots, no writer", snapshot_read, None, 0),
+        ("persistent snapshots, writer", snapshot_read, snapshot_writer(1), 1),
+        ("persistent snapshots, 100-update batches", snapshot_read, snapshot_writer(100), 100),
+        ("locked OrderStatisticTree, no writer", locked_read, None, 0),
+        ("locked OrderStatisticTree, writer", locked_read, locked_writer(1), 1),
+        ("locked OrderStatisticTree, 100-update batches", locked_read, locked_writer(100), 100),
+    ]
+    for label, read, write, batch in runs:
+        read_rate, write_rate = _run(readers, seconds, read, write)
+        write_cell = f"{write_rate * batch:10,.0f}" if write is not None else ""
+        print(f"   {label:46} {read_rate:10,.0f} {write_cell}")
+    print()
+    _check(shared.snapshot())
+    print(f"{shared.version:,} versions published; first version's root freed: {first() is None}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Rollup Benchmark for Composite Pattern
+Compares cached size rollups against the walk-every-descendant approach.
+"""
+
+import time
+from file import File
+from directory import Directory
+from file_system_component import FileSystemComponent
+from synthetic_trees import build_deep_tree, build_wide_tree, iter_directories
+
+
+def uncached_size(component: FileSystemComponent) -> int:
+    """Sum file sizes by visiting every descendant (the pre-cache algorithm)"""
+    total = 0
+    stack = [component]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Directory):
+            stack.extend(node.children)
+        else:
+            total += node.get_size()
+    return total
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def benchmark_tree(label: str, root: Directory) -> None:
+    """Time root and every-directory size queries, cached vs uncached"""
+    directories = list(iter_directories(root))
+    nodes = root.get_file_count() + root.get_directory_count() + 1
+
+    print(f"{label}: {nodes:,} nodes, {len(directories):,} directories")
+    assert uncached_size(root) == root.get_size()
+
+    cached_root = _time(lambda: root.get_size())
+    uncached_root = _time(lambda: uncached_size(root))
+    print(f"   root size        cached {cached_root * 1e6:10.1f} µs"
+          f"   uncached {uncached_root * 1e3:10.1f} ms")
+
+    # What draw_graphical_tree does: ask every directory for its size
+    cached_all = _time(lambda: [d.get_size() for d in directories])
+    uncached_all = _time(lambda: [uncached_size(d) for d in directories])
+    print(f"   every directory  cached {cached_all * 1e3:10.1f} ms"
+          f"   uncached {uncached_all * 1e3:10.1f} ms"
+          f"   ({uncached_all / cached_all:,.0f}x)")
+
+    # Mutation cost: one file added and removed at the deepest directory
+    deepest = directories[-1]
+    probe = File("probe.dat", 10)
+    mutate = _time(lambda: (deepest.add(probe), deepest.remove(probe)))
+    print(f"   add+remove at deepest directory {mutate * 1e6:10.1f} µs")
+    print()
+
+
+def main():
+    """Run the rollup benchmark on synthetic deep and wide trees"""
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - CACHED VS UNCACHED SIZE ROLLUPS")
+    print("=" * 70)
+    print()
+
+    benchmark_tree("Deep chain (depth 2,000)", build_deep_tree(2000, files_per_level=5))
+    benchmark_tree("Wide tree (fanout 10, 5 levels)", build_wide_tree(10, 5, files_per_dir=10))
+    benchmark_tree("Wide tree (fanout 40, 4 levels)", build_wide_tree(40, 4, files_per_dir=5))
+
+
+if __name__ == "__main__":
+    main()
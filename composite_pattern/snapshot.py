@@ -0,0 +1,268 @@
+"""
+Snapshot - Compact binary snapshots of Composite Pattern trees
+Saves a Directory/File hierarchy to a file and reopens it lazily via mmap.
+
+File layout (little endian):
+    header      magic, version, record size, node count, section offsets
+    node table  one fixed-size record per node, in breadth-first order, so
+                the children of a directory are a contiguous run of records
+    order table uint32 per non-root node: for each directory, the positions
+                of its children sorted by name (enables binary search)
+    name table  all names, UTF-8 encoded back to back
+
+Each record stores the precomputed subtree size, file count and directory
+count. Opening a snapshot only maps the file and reads the root record;
+LazyDirectory materializes child objects the first time they are touched,
+and a name lookup materializes just the matching child.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from file_system_component import FileSystemComponent
+from file import File
+from directory import Directory
+
+
+MAGIC = b"CPSNAP\x00\x01"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQQ")   # magic, version, reserved, record size,
+                                       # node count, order/names offsets, names length
+RECORD = struct.Struct("<QIQHQQQB")    # first child, child count, name offset,
+                                       # name length, size, files, dirs, flags
+ORDER = struct.Struct("<I")
+IS_DIRECTORY = 1
+
+
+def save_snapshot(root: Directory, path: str) -> int:
+    """Write `root` and everything below it to `path`; returns the node count"""
+    order: List[FileSystemComponent] = [root]
+    i = 0
+    while i < len(order):
+        node = order[i]
+        if isinstance(node, Directory):
+            order.extend(node.children)
+        i += 1
+    count = len(order)
+
+    records = bytearray(RECORD.size * count)
+    sorted_positions = array("I")
+    names: List[bytes] = []
+    name_offset = 0
+    next_child = 1
+    for index, node in enumerate(order):
+        name = node.name.encode()
+        if len(name) > 0xFFFF:
+            raise ValueError(f"Name too long for a snapshot: {node.name[:40]}...")
+        names.append(name)
+        if isinstance(node, Directory):
+            children = node.children
+            RECORD.pack_into(records, index * RECORD.size, next_child, len(children),
+                             name_offset, len(name), node.get_size(), node.get_file_count(),
+                             node.get_directory_count(), IS_DIRECTORY)
+            child_names = [child.name for child in children]
+            sorted_positions.extend(sorted(range(len(children)), key=child_names.__getitem__))
+            next_child += len(children)
+        else:
+            RECORD.pack_into(records, index * RECORD.size, next_child, 0,
+                             name_offset, len(name), node.get_size(), 1, 0, 0)
+        name_offset += len(name)
+
+    if sys.byteorder != "little":
+        sorted_positions.byteswap()
+    order_offset = HEADER.size + len(records)
+    names_offset = order_offset + len(sorted_positions) * ORDER.size
+    with open(path, "wb") as stream:
+        stream.write(HEADER.pack(MAGIC, VERSION, 0, RECORD.size, count,
+                                 order_offset, names_offset, name_offset))
+        stream.write(records)
+        stream.write(sorted_positions.tobytes())
+        for name in names:
+            stream.write(name)
+    return count
+
+
+class Snapshot:
+    """A memory-mapped snapshot file; node data is read on demand"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"'{path}' is empty, not a snapshot") from None
+        (magic, version, _, record_size, self.node_count,
+         self._order_offset, self._names_offset, _) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a composite tree snapshot")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {version}")
+        self._root: Optional[LazyDirectory] = None
+
+    def close(self) -> None:
+        """Unmap the file; nodes that were not materialized become unusable"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def root(self) -> 'LazyDirectory':
+        """The root directory (only its own record is read)"""
+        if self._root is None:
+            self._root = LazyDirectory(self, 0)
+        return self._root
+
+    def record(self, index: int) -> tuple:
+        return RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size)
+
+    def name(self, index: int, record: Optional[tuple] = None) -> str:
+        record = record or self.record(index)
+        start = self._names_offset + record[2]
+        return self._map[start:start + record[3]].decode()
+
+    def node(self, index: int) -> FileSystemComponent:
+        """Materialize one node (a LazyDirectory or a File)"""
+        record = self.record(index)
+        if record[7] & IS_DIRECTORY:
+            return LazyDirectory(self, index, record)
+        return File(self.name(index, record), record[4])
+
+    def find_child(self, index: int, name: str) -> Optional[int]:
+        """Node index of the child called `name`, by binary search, or None"""
+        first, count = self.record(index)[:2]
+        base = self._order_offset + (first - 1) * ORDER.size
+        target = name
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            child = first + ORDER.unpack_from(self._map, base + mid * ORDER.size)[0]
+            child_name = self.name(child)
+            if child_name == target:
+                return child
+            if child_name < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+class LazyDirectory(Directory):
+    """Directory backed by a snapshot record; children load on first touch"""
+
+    def __init__(self, snapshot: Snapshot, index: int, record: Optional[tuple] = None):
+        record = record or snapshot.record(index)
+        self._snapshot = snapshot
+        self._index = index
+        self._loaded = False
+        self._materialized: Dict[int, FileSystemComponent] = {}
+        super().__init__(snapshot.name(index, record))
+        self._size, self._file_count, self._dir_count = record[4:7]
+
+    # Directory reads these two attributes everywhere; loading them on
+    # access keeps every inherited method correct for lazy directories.
+    @property
+    def children(self) -> List[FileSystemComponent]:
+        if not self._loaded:
+            self._load()
+        return super().children
+
+    @property
+    def _by_name(self) -> Dict[str, int]:
+        if not self._loaded:
+            self._load()
+        return self._names
+
+    @_by_name.setter
+    def _by_name(self, value: Dict[str, int]) -> None:
+        self._names = value
+
+    def is_loaded(self) -> bool:
+        """Whether this directory's children have been materialized"""
+        return self._loaded
+
+    def get_child_by_name(self, name: str) -> FileSystemComponent:
+        """Materialize only the named child (binary search in the snapshot)"""
+        if self._loaded:
+            return super().get_child_by_name(name)
+        index = self._snapshot.find_child(self._index, name)
+        if index is None:
+            raise KeyError(f"'{self.name}' has no child named '{name}'")
+        return self._child(index)
+
+    def has_child(self, name: str) -> bool:
+        if self._loaded:
+            return super().has_child(name)
+        return self._snapshot.find_child(self._index, name) is not None
+
+    def _child(self, index: int) -> FileSystemComponent:
+        node = self._materialized.get(index)
+        if node is None:
+            node = self._snapshot.node(index)
+            node.parent = self
+            self._materialized[index] = node
+        return node
+
+    def _load(self) -> None:
+        first, count = self._snapshot.record(self._index)[:2]
+        children = [self._child(index) for index in range(first, first + count)]
+        self._materialized = {}
+        self._children = children
+        self._names = {child.name: i for i, child in enumerate(children)}
+        self._loaded = True
+
+
+def open_snapshot(path: str) -> LazyDirectory:
+    """Open a snapshot and return its lazily loaded root directory"""
+    return Snapshot(path).root()
+
+
+def main():
+    """Save a synthetic tree, reopen it lazily and time the first queries"""
+    from synthetic_trees import build_wide_tree
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "tree.snapshot"
+    fanout = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - BINARY SNAPSHOTS")
+    print("=" * 70)
+    print()
+
+    root = build_wide_tree(fanout, 5, files_per_dir=10)
+    start = time.perf_counter()
+    count = save_snapshot(root, path)
+    print(f"Saved {count:,} nodes to {path} ({os.path.getsize(path) / 2**20:.1f} MiB)"
+          f" in {time.perf_counter() - start:.2f} s")
+    target = "dir_0_1/dir_1_2/dir_2_3/dir_3_4/file_7.dat"
+    del root
+
+    start = time.perf_counter()
+    snapshot = Snapshot(path)
+    loaded = snapshot.root()
+    size = loaded.get_size()
+    print(f"Open + root.get_size() = {size:,}: {(time.perf_counter() - start) * 1e3:.3f} ms")
+
+    start = time.perf_counter()
+    node = loaded.resolve(target)
+    print(f"Path lookup {target} ({node.get_size()} KB): "
+          f"{(time.perf_counter() - start) * 1e3:.3f} ms")
+    print(f"Root children loaded: {loaded.is_loaded()}")
+    snapshot.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
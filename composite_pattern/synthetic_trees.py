@@ -0,0 +1,96 @@
+"""
+Synthetic tree builders for Composite Pattern benchmarks
+Generates Directory/File hierarchies of a chosen shape and size.
+"""
+
+import random
+
+from file import File
+from directory import Directory
+
+
+def build_deep_tree(depth: int, files_per_level: int = 1, file_size: int = 1) -> Directory:
+    """Build a chain of `depth` nested directories, each holding some files"""
+    # Built bottom-up so each add() only updates the not-yet-attached parent
+    child = None
+    for level in range(depth, -1, -1):
+        current = Directory(f"dir_{level}" if level else "root")
+        for i in range(files_per_level):
+            current.add(File(f"file_{level}_{i}.dat", file_size))
+        if child is not None:
+            current.add(child)
+        child = current
+    return child
+
+
+def build_wide_tree(fanout: int, levels: int, files_per_dir: int = 1,
+                    file_size: int = 1) -> Directory:
+    """Build a tree where every directory has `fanout` subdirectories"""
+    root = Directory("root")
+    frontier = [root]
+    for level in range(levels):
+        next_frontier = []
+        for directory in frontier:
+            for i in range(files_per_dir):
+                directory.add(File(f"file_{i}.dat", file_size))
+            if level < levels - 1:
+                for i in range(fanout):
+                    child = Directory(f"dir_{level}_{i}")
+                    directory.add(child)
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return root
+
+
+def build_fanout_tree(node_count: int, fanout: int = 10, files_per_dir: int = 10,
+                      file_size: int = 1) -> Directory:
+    """Fill directories breadth-first (fanout subdirectories each) up to about node_count nodes"""
+    root = Directory("root")
+    nodes = 1
+    frontier = [root]
+    position = 0
+    while nodes < node_count:
+        directory = frontier[position]
+        position += 1
+        files = min(files_per_dir, node_count - nodes)
+        subdirectories = [Directory(f"dir_{i}") for i in range(min(fanout, node_count - nodes - files))]
+        directory.add_all([File(f"file_{i}.dat", file_size) for i in range(files)] + subdirectories)
+        frontier.extend(subdirectories)
+        nodes += files + len(subdirectories)
+    return root
+
+
+def build_power_law_tree(node_count: int, alpha: float = 1.2, seed: int = 0) -> Directory:
+    """
+    A tree with a heavy-tailed number of files per directory
+
+    Files per directory follow a Pareto distribution with shape `alpha`,
+    subdirectories attach preferentially to directories that already have
+    many (so fan-out is heavy-tailed too), and file sizes are log-normal.
+    """
+    rng = random.Random(seed)
+    root = Directory("root")
+    nodes = 1
+    attach = [root]  # Each directory appears once per subdirectory it has, plus once
+    while nodes < node_count:
+        directory = Directory(f"dir_{nodes}")
+        files = min(int(rng.paretovariate(alpha)) - 1, 10_000, node_count - nodes - 1)
+        directory.add_all(File(f"file_{i}.dat", int(rng.lognormvariate(9, 2.5)))
+                          for i in range(files))
+        parent = rng.choice(attach)
+        parent.add(directory)
+        attach.append(parent)
+        attach.append(directory)
+        nodes += files + 1
+    return root
+
+
+def iter_directories(root: Directory):
+    """Yield every directory in the tree (preorder, without recursion)"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        yield directory
+        for child in reversed(directory.children):
+            if isinstance(child, Directory):
+                stack.append(child)
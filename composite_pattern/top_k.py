@@ -0,0 +1,240 @@
+"""
+Top-K Reports for Composite Pattern
+Finds the largest files and directories without sorting the whole tree.
+
+top_k_files/top_k_dirs make one pass with a size-k min-heap: O(n log k).
+When a directory's cached aggregates are fresh (see tree_query.py) whole
+subtrees that cannot beat the current k-th entry are skipped.
+
+TopKTracker is the maintained mode: it registers as a TreeObserver and
+keeps lazy-deletion max-heaps of every file and directory, so the answer
+stays current as files are resized and nodes are added or removed.
+"""
+
+import heapq
+import random
+import sys
+import time
+from itertools import count
+from typing import Dict, List, Sequence, Tuple
+
+from file_system_component import FileSystemComponent
+from directory import Directory, TreeObserver
+
+
+def _sorted_largest(heap: list) -> list:
+    return [node for _, _, node in sorted(heap, key=lambda entry: (-entry[0], entry[1]))]
+
+
+def top_k_files(root: Directory, k: int) -> List[FileSystemComponent]:
+    """The k largest files below `root`, largest first"""
+    if k <= 0:
+        return []
+    heap: List[Tuple[int, int, FileSystemComponent]] = []
+    order = count()
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        for child in directory.children:
+            if isinstance(child, Directory):
+                stats = child._query_stats
+                if len(heap) == k and stats is not None and (stats[1] is None
+                                                             or stats[1] <= heap[0][0]):
+                    continue
+                stack.append(child)
+                continue
+            size = child.get_size()
+            if len(heap) < k:
+                heapq.heappush(heap, (size, next(order), child))
+            elif size > heap[0][0]:
+                heapq.heapreplace(heap, (size, next(order), child))
+    return _sorted_largest(heap)
+
+
+def top_k_dirs(root: Directory, k: int) -> List[Directory]:
+    """The k largest directories below `root` (excluding `root`), largest first"""
+    if k <= 0:
+        return []
+    heap: List[Tuple[int, int, Directory]] = []
+    order = count()
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        for child in directory.children:
+            if not isinstance(child, Directory):
+                continue
+            size = child.get_size()
+            if len(heap) < k:
+                heapq.heappush(heap, (size, next(order), child))
+            elif size > heap[0][0]:
+                heapq.heapreplace(heap, (size, next(order), child))
+            else:
+                # Subdirectories are never larger than their parent
+                continue
+            if child._dir_count:
+                stack.append(child)
+    return _sorted_largest(heap)
+
+
+class _MaintainedHeap:
+    """Max-heap of (size, node) with lazy deletion of outdated entries"""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, FileSystemComponent]] = []
+        self._live: Dict[FileSystemComponent, int] = {}  # node -> sequence of its live entry
+        self._sequence = count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def push(self, node: FileSystemComponent) -> None:
+        """Insert or refresh `node` at its current size"""
+        sequence = next(self._sequence)
+        self._live[node] = sequence
+        heapq.heappush(self._heap, (-node.get_size(), sequence, node))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            self._compact()
+
+    def discard(self, node: FileSystemComponent) -> None:
+        self._live.pop(node, None)
+
+    def largest(self, k: int) -> List[FileSystemComponent]:
+        """The k largest live nodes; outdated entries met on the way are dropped"""
+        result = []
+        kept = []
+        while self._heap and len(result) < k:
+            entry = heapq.heappop(self._heap)
+            if self._live.get(entry[2]) == entry[1]:
+                result.append(entry[2])
+                kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._live.get(entry[2]) == entry[1]]
+        heapq.heapify(self._heap)
+
+
+class TopKTracker(TreeObserver):
+    """Keeps top-k file and directory answers current as the tree changes"""
+
+    def __init__(self, root: Directory):
+        self.root = root
+        self._files = _MaintainedHeap()
+        self._dirs = _MaintainedHeap()
+        for child in root.children:
+            self._track_subtree(child)
+        root.add_observer(self)
+
+    def close(self) -> None:
+        """Stop tracking changes"""
+        self.root.remove_observer(self)
+
+    def top_k_files(self, k: int) -> List[FileSystemComponent]:
+        """O(k log n): the k largest files below the root, largest first"""
+        return self._files.largest(k)
+
+    def top_k_dirs(self, k: int) -> List[Directory]:
+        """O(k log n): the k largest directories below the root, largest first"""
+        return self._dirs.largest(k)
+
+    def on_added(self, directory: Directory, components: Sequence[FileSystemComponent]) -> None:
+        for component in components:
+            self._track_subtree(component)
+        self._refresh_ancestors(directory)
+
+    def on_removed(self, directory: Directory, component: FileSystemComponent) -> None:
+        stack = [component]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Directory):
+                self._dirs.discard(node)
+                stack.extend(node.children)
+            else:
+                self._files.discard(node)
+        self._refresh_ancestors(directory)
+
+    def on_resized(self, component: FileSystemComponent) -> None:
+        self._files.push(component)
+        self._refresh_ancestors(component.parent)
+
+    def _track_subtree(self, component: FileSystemComponent) -> None:
+        stack = [component]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, Directory):
+                self._dirs.push(node)
+                stack.extend(node.children)
+            else:
+                self._files.push(node)
+
+    def _refresh_ancestors(self, directory: Directory) -> None:
+        """Re-key the directories whose totals changed (O(depth log n))"""
+        node = directory
+        while node is not None and node is not self.root:
+            self._dirs.push(node)
+            node = node.parent
+
+
+def _all_files(root: Directory) -> List[FileSystemComponent]:
+    files = []
+    stack = [root]
+    while stack:
+        for child in stack.pop().children:
+            (stack if isinstance(child, Directory) else files).append(child)
+    return files
+
+
+def main():
+    """Time one-pass top-k against a full sort, then the maintained mode"""
+    from synthetic_trees import build_wide_tree
+
+    fanout = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    k = 10
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - TOP-K LARGEST FILES AND DIRECTORIES")
+    print("=" * 70)
+    print()
+
+    rng = random.Random(1)
+    root = build_wide_tree(fanout, 5, files_per_dir=10)
+    files = _all_files(root)
+    for node in files:
+        node.size = rng.randint(1, 1_000_000)
+    print(f"Tree: {root.get_file_count():,} files, {root.get_directory_count():,} directories")
+
+    start = time.perf_counter()
+    largest = top_k_files(root, k)
+    heap_time = time.perf_counter() - start
+    start = time.perf_counter()
+    by_sort = sorted(_all_files(root), key=lambda node: node.get_size(), reverse=True)[:k]
+    sort_time = time.perf_counter() - start
+    assert [n.get_size() for n in largest] == [n.get_size() for n in by_sort]
+    print(f"top_k_files({k}): {heap_time * 1e3:.1f} ms   (walk + sort everything: {sort_time * 1e3:.1f} ms)")
+    start = time.perf_counter()
+    top_k_dirs(root, k)
+    print(f"top_k_dirs({k}):  {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print()
+
+    tracker = TopKTracker(root)
+    start = time.perf_counter()
+    for _ in range(1000):
+        rng.choice(files).size = rng.randint(1, 2_000_000)
+    update_time = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    largest = tracker.top_k_files(k)
+    query_time = time.perf_counter() - start
+    assert [n.get_size() for n in largest] == [n.get_size() for n in top_k_files(root, k)]
+    assert [n.get_size() for n in tracker.top_k_dirs(k)] == [n.get_size() for n in top_k_dirs(root, k)]
+    print(f"Maintained mode: {update_time * 1e6:.1f} µs per resize, "
+          f"{query_time * 1e3:.3f} ms per top-{k} query")
+    print()
+    for node in largest[:5]:
+        print(f"   {node.name:20} {node.get_size():>12,} KB")
+    tracker.close()
+
+
+if __name__ == "__main__":
+    main()
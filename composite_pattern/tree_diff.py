@@ -0,0 +1,138 @@
+"""
+Tree Diff for Composite Pattern
+Compares two Directory trees using their Merkle digests.
+
+Subtrees whose digests match are skipped without being visited, so the
+cost of diff() follows the size of the change rather than the size of the
+trees. Paths are '/'-separated and relative to the roots being compared.
+"""
+
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import List
+
+from file import File
+from directory import Directory
+
+
+@dataclass
+class TreeDiff:
+    """Paths that were added, removed or changed between two trees"""
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    directories_compared: int = 0
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        lines = [f"+ {path}" for path in self.added]
+        lines += [f"- {path}" for path in self.removed]
+        lines += [f"~ {path}" for path in self.changed]
+        return "\n".join(lines) if lines else "(no differences)"
+
+
+def diff(old_root: Directory, new_root: Directory) -> TreeDiff:
+    """
+    Compare two trees, enabling digests on either root if necessary
+
+    An added or removed directory is reported once, by its own path. A
+    changed path is a file whose size differs, or an entry that switched
+    between file and directory.
+    """
+    for root in (old_root, new_root):
+        if root.get_digest() is None:
+            root.enable_digests()
+
+    result = TreeDiff()
+    stack = [(old_root, new_root, "")]
+    while stack:
+        old, new, path = stack.pop()
+        result.directories_compared += 1
+        if old._digest == new._digest:
+            continue
+        for child in old.children:
+            child_path = f"{path}/{child.name}" if path else child.name
+            if not new.has_child(child.name):
+                result.removed.append(child_path)
+                continue
+            other = new.get_child_by_name(child.name)
+            if isinstance(child, Directory) and isinstance(other, Directory):
+                if child._digest != other._digest:
+                    stack.append((child, other, child_path))
+            elif isinstance(child, Directory) or isinstance(other, Directory):
+                result.changed.append(child_path)
+            elif child.get_size() != other.get_size():
+                result.changed.append(child_path)
+        for child in new.children:
+            if not old.has_child(child.name):
+                result.added.append(f"{path}/{child.name}" if path else child.name)
+    return result
+
+
+def _copy_tree(root: Directory) -> Directory:
+    """Deep copy of a Directory/File tree (iterative)"""
+    copy = Directory(root.name)
+    stack = [(root, copy)]
+    while stack:
+        source, target = stack.pop()
+        children = []
+        for child in source.children:
+            if isinstance(child, Directory):
+                child_copy = Directory(child.name)
+                stack.append((child, child_copy))
+            else:
+                child_copy = File(child.name, child.get_size())
+            children.append(child_copy)
+        target.add_all(children)
+    return copy
+
+
+def main():
+    """Diff yesterday's and today's trees after a handful of changes"""
+    from synthetic_trees import build_wide_tree
+    from rollup_benchmark import uncached_size
+
+    # At least 2, so the removed subtree and the edited file are apart
+    fanout = max(2, int(sys.argv[1]) if len(sys.argv) > 1 else 10)
+
+    def path(*picks: int) -> str:
+        """Path through build_wide_tree's dir_<level>_<i> directories, wrapped to the fanout"""
+        return "/".join(f"dir_{level}_{pick % fanout}" for level, pick in enumerate(picks))
+
+    print("=" * 70)
+    print("COMPOSITE PATTERN - MERKLE TREE DIFF")
+    print("=" * 70)
+    print()
+
+    yesterday = build_wide_tree(fanout, 5, files_per_dir=10)
+    today = _copy_tree(yesterday)
+    yesterday.enable_digests()
+    today.enable_digests()
+    nodes = today.get_file_count() + today.get_directory_count() + 1
+    print(f"Trees: {nodes:,} nodes each, root digest {today.get_digest()}")
+
+    # A few changes, applied through the normal Directory/File API
+    today.resolve(path(1, 2)).add(File("new_report.pdf", 300))
+    today.resolve(path(3, 0, 4)).remove(today.resolve(path(3, 0, 4, 1)))
+    today.resolve(path(7, 7, 7, 7) + "/file_3.dat").size = 4096
+    print(f"After changes,  root digest {today.get_digest()}")
+    print()
+
+    start = time.perf_counter()
+    changes = diff(yesterday, today)
+    elapsed = time.perf_counter() - start
+    print(changes)
+    print()
+    print(f"diff(): {elapsed * 1e3:.2f} ms, {changes.directories_compared} directories compared")
+
+    start = time.perf_counter()
+    uncached_size(yesterday)
+    uncached_size(today)
+    print(f"Full walk of both trees: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Tree Query Engine for Composite Pattern
+Predicate queries over Directory/File trees with aggregate-based pruning.
+
+    root.query(name="*.mp4", min_size=1 << 30, kind="file")
+    root.resolve("media").query(kind="directory", min_size=10 << 30)
+
+Results are yielded lazily in preorder. Before descending into a
+directory the query checks the directory's cached aggregates: total size,
+smallest/largest file size and the set of file extensions below it. A
+subtree that cannot contain a match is skipped without being visited.
+Other composites (FlatTree's FlatNode) are searched through their
+is_directory() and children, without pruning.
+"""
+
+import fnmatch
+import random
+import re
+import sys
+import time
+from typing import Iterator, Optional
+
+from file_system_component import FileSystemComponent, extension_of
+from file import File
+from directory import Directory
+
+
+class TreeQuery:
+    """A conjunction of name, size, type and depth predicates"""
+
+    FILE = "file"
+    DIRECTORY = "directory"
+
+    def __init__(self, name: Optional[str] = None, min_size: Optional[int] = None,
+                 max_size: Optional[int] = None, kind: Optional[str] = None,
+                 min_depth: int = 1, max_depth: Optional[int] = None):
+        """
+        name:      glob matched case-sensitively against the entry name
+        min_size:  inclusive lower bound on get_size()
+        max_size:  inclusive upper bound on get_size()
+        kind:      TreeQuery.FILE, TreeQuery.DIRECTORY or None for both
+        min_depth: shallowest level returned (the queried node is level 0)
+        max_depth: deepest level visited
+        """
+        if kind not in (None, self.FILE, self.DIRECTORY):
+            raise ValueError(f"Unknown kind {kind!r}")
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.kind = kind
+        self.min_depth = min_depth
+        self.max_depth = max_depth
+        self._name_regex = re.compile(fnmatch.translate(name)) if name is not None else None
+        self._extension = self._required_extension(name)
+        self.visited = 0
+
+    @staticmethod
+    def _required_extension(pattern: Optional[str]) -> Optional[str]:
+        """Extension every match must have, for patterns like '*.mp4' or '*.tar.gz'"""
+        if pattern is None or not pattern.startswith("*"):
+            return None
+        suffix = pattern[1:]
+        if "." not in suffix or any(char in suffix for char in "*?["):
+            return None
+        return extension_of(suffix)
+
+    @staticmethod
+    def is_directory(component: FileSystemComponent) -> bool:
+        """Directories, and views such as FlatNode that report being one"""
+        if isinstance(component, Directory):
+            return True
+        is_directory = getattr(component, "is_directory", None)
+        return bool(is_directory()) if callable(is_directory) else False
+
+    def matches(self, component: FileSystemComponent) -> bool:
+        """Test the type, name and size predicates (not depth)"""
+        is_directory = self.is_directory(component)
+        if self.kind == self.FILE and is_directory:
+            return False
+        if self.kind == self.DIRECTORY and not is_directory:
+            return False
+        if self._name_regex is not None and not self._name_regex.match(component.name):
+            return False
+        size = component.get_size()
+        if self.min_size is not None and size < self.min_size:
+            return False
+        if self.max_size is not None and size > self.max_size:
+            return False
+        return True
+
+    def can_skip(self, directory: Directory) -> bool:
+        """True if nothing below `directory` can match, judged from its aggregates"""
+        return self._no_files_below(directory) and self._no_directories_below(directory)
+
+    def _no_files_below(self, directory: Directory) -> bool:
+        if self.kind == self.DIRECTORY:
+            return True
+        size_range = directory.get_file_size_range()
+        if size_range is None:
+            return True
+        smallest, largest = size_range
+        if self.min_size is not None and largest < self.min_size:
+            return True
+        if self.max_size is not None and smallest > self.max_size:
+            return True
+        return self._extension is not None and self._extension not in directory.get_extensions()
+
+    def _no_directories_below(self, directory: Directory) -> bool:
+        if self.kind == self.FILE or directory.get_directory_count() == 0:
+            return True
+        # A subdirectory is never larger than the directory containing it
+        return self.min_size is not None and directory.get_size() < self.min_size
+
+    def run(self, root: FileSystemComponent) -> Iterator[FileSystemComponent]:
+        """Yield matches below (and possibly including) `root` in preorder"""
+        self.visited = 0
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            self.visited += 1
+            if depth >= self.min_depth and self.matches(node):
+                yield node
+            if not self.is_directory(node):
+                continue
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            # Only Directory caches the aggregates that pruning needs
+            if isinstance(node, Directory) and self.can_skip(node):
+                continue
+            for child in reversed(node.children):
+                stack.append((child, depth + 1))
+
+
+def brute_force(root: Directory, query: TreeQuery) -> Iterator[FileSystemComponent]:
+    """The hand-written full recursion a query replaces (for the benchmark)"""
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if depth >= query.min_depth and query.matches(node):
+            yield node
+        if isinstance(node, Directory):
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+
+
+def build_skewed_tree(directories: int, seed: int = 7) -> Directory:
+    """Mostly small documents; a few rare directories hold large videos"""
+    rng = random.Random(seed)
+    root = Directory("root")
+    pool = [root]
+    for i in range(directories):
+        directory = Directory(f"d{i}")
+        files = [File(f"note_{k}.txt", rng.randint(1, 64)) for k in range(rng.randint(2, 12))]
+        if rng.random() < 0.002:
+            files.append(File(f"movie_{i}.mp4", rng.randint(2 << 20, 8 << 20)))
+        directory.add_all(files)
+        # Power-law-ish: attach to a recent directory more often than an old one
+        parent = pool[int(len(pool) * (1 - rng.random() ** 3))] if len(pool) > 1 else root
+        parent.add(directory)
+        pool.append(directory)
+    return root
+
+
+def main():
+    """Compare pruned queries with the brute-force walk on a skewed tree"""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    print("=" * 78)
+    print("COMPOSITE PATTERN - QUERY ENGINE WITH AGGREGATE PRUNING")
+    print("=" * 78)
+    print()
+
+    root = build_skewed_tree(count)
+    nodes = root.get_file_count() + root.get_directory_count() + 1
+    print(f"Skewed tree: {nodes:,} nodes")
+    start = time.perf_counter()
+    root.get_extensions()
+    print(f"First stats build: {(time.perf_counter() - start) * 1e3:.1f} ms (then cached)")
+    print()
+
+    queries = [
+        ("*.mp4 files over 4 MB", TreeQuery(name="*.mp4", min_size=4 << 20, kind=TreeQuery.FILE)),
+        ("files over 1 MB", TreeQuery(min_size=1 << 20, kind=TreeQuery.FILE)),
+        ("*.iso files", TreeQuery(name="*.iso", kind=TreeQuery.FILE)),
+        ("directories over 20 MB", TreeQuery(min_size=20 << 20, kind=TreeQuery.DIRECTORY)),
+        ("*.txt files (no pruning)", TreeQuery(name="*.txt", kind=TreeQuery.FILE)),
+    ]
+    print(f"{'query':28} {'matches':>8} {'visited':>9} {'pruned ms':>10} {'brute ms':>10} {'speedup':>8}")
+    for label, query in queries:
+        start = time.perf_counter()
+        pruned = list(query.run(root))
+        pruned_time = time.perf_counter() - start
+        start = time.perf_counter()
+        expected = list(brute_force(root, query))
+        brute_time = time.perf_counter() - start
+        assert [id(node) for node in pruned] == [id(node) for node in expected]
+        print(f"{label:28} {len(pruned):8,} {query.visited:9,} {pruned_time * 1e3:10.1f}"
+              f" {brute_time * 1e3:10.1f} {brute_time / pruned_time:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,138 @@
 """
 Visual Tree Generator for Composite Pattern
 Creates an actual tree diagram (like binary tree visualization)
+
+The draw_* methods build the whole diagram as one string. For large trees
+use iter_tree()/write_tree(), which walk the tree with an explicit stack
+and produce one line at a time, optionally truncated by depth and by the
+number of children shown per directory.
 """
 
+import sys
+from typing import Iterator, List, Optional, TextIO
+
 from file_system_component import FileSystemComponent
 from file import File
 from directory import Directory
 
 
+class _LineStyle:
+    """Connectors and node formats for one streaming renderer style"""
+
+    def __init__(self, mid: str, last: str, bar: str, blank: str,
+                 file_format: str, dir_format: str, ellipsis: str):
+        self.mid = mid
+        self.last = last
+        self.bar = bar
+        self.blank = blank
+        self.file_format = file_format
+        self.dir_format = dir_format
+        self.ellipsis = ellipsis
+
+    def node(self, component: FileSystemComponent, is_directory: bool) -> str:
+        template = self.dir_format if is_directory else self.file_format
+        return template.format(name=component.name, size=component.get_size())
+
+
 class TreeVisualizer:
     """Generates visual tree representations of the file system"""
+
+    # Streaming styles, matching draw_tree, draw_ascii_tree and draw_graphical_tree
+    STYLES = {
+        "unicode": _LineStyle("├── ", "└── ", "│   ", "    ",
+                              "📄 {name} ({size} KB)", "📁 {name}/", "…"),
+        "ascii": _LineStyle("|-- ", "+-- ", "|   ", "    ",
+                            "[F] {name} ({size} KB)", "[D] {name}/", "..."),
+        "graphical": _LineStyle("    ├── ", "    └── ", "    │   ", "        ",
+                                "📄 {name} ({size} KB)", "📁 {name}/ (Total: {size} KB)", "…"),
+    }
+
+    @staticmethod
+    def _is_directory(component: FileSystemComponent) -> bool:
+        if isinstance(component, Directory):
+            return True
+        # Array-backed views (FlatNode) report their kind themselves
+        is_directory = getattr(component, "is_directory", None)
+        return bool(is_directory()) if callable(is_directory) else False
+
+    @staticmethod
+    def iter_tree(component: FileSystemComponent, style: str = "unicode",
+                  max_depth: Optional[int] = None,
+                  max_children: Optional[int] = None) -> Iterator[str]:
+        """
+        Yield the tree diagram one line at a time, without recursion
+
+        style:        "unicode", "ascii" or "graphical"
+        max_depth:    deepest level shown (the root is level 0)
+        max_children: children shown per directory before the rest is elided
+
+        Elided entries are summarised by a line such as "└── … 1,234 more".
+        Memory use is proportional to the depth of the tree, not its size:
+        stack frames hold no prefixes, only the current line's prefix is
+        kept, growing by one segment per level entered and shrinking on exit.
+        """
+        try:
+            line_style = TreeVisualizer.STYLES[style]
+        except KeyError:
+            raise ValueError(f"Unknown style {style!r}; choose from {sorted(TreeVisualizer.STYLES)}") from None
+        is_directory = TreeVisualizer._is_directory
+
+        yield line_style.node(component, is_directory(component))
+        if not is_directory(component):
+            return
+
+        # Each frame: [child iterator, next index, shown count, elided count, depth]
+        stack: List[list] = []
+        # One shared segment per open level below the root ("│   " or "    ")
+        segments: List[str] = []
+        prefix = ""
+
+        def push(directory: FileSystemComponent, depth: int) -> None:
+            children = directory.children
+            shown = len(children)
+            if max_depth is not None and depth >= max_depth:
+                shown = 0
+            elif max_children is not None:
+                shown = min(shown, max_children)
+            stack.append([iter(children), 0, shown, len(children) - shown, depth])
+
+        push(component, 0)
+        while stack:
+            frame = stack[-1]
+            children, index, shown, elided, depth = frame
+            if index == shown:
+                stack.pop()
+                if elided:
+                    label = "more" if shown else "hidden"
+                    yield f"{prefix}{line_style.last}{line_style.ellipsis} {elided:,} {label}"
+                if segments:
+                    prefix = prefix[:len(prefix) - len(segments.pop())]
+                continue
+            frame[1] = index + 1
+
+            child = next(children)
+            is_last = index == shown - 1 and not elided
+            child_is_directory = is_directory(child)
+            connector = line_style.last if is_last else line_style.mid
+            yield f"{prefix}{connector}{line_style.node(child, child_is_directory)}"
+            if child_is_directory:
+                segment = line_style.blank if is_last else line_style.bar
+                segments.append(segment)
+                prefix += segment
+                push(child, depth + 1)
+
+    @staticmethod
+    def write_tree(component: FileSystemComponent, stream: Optional[TextIO] = None,
+                   style: str = "unicode", max_depth: Optional[int] = None,
+                   max_children: Optional[int] = None) -> int:
+        """Write the tree diagram line by line to a text stream; returns lines written"""
+        stream = sys.stdout if stream is None else stream
+        count = 0
+        for line in TreeVisualizer.iter_tree(component, style, max_depth, max_children):
+            stream.write(line)
+            stream.write("\n")
+            count += 1
+        return count
     
     @staticmethod
     def draw_tree(component: FileSystemComponent, prefix: str = "", is_last: bool = True) -> str:
@@ -204,6 +327,13 @@ def main():
     print(tree3)
     print()
     
+    # Streaming renderer with truncation (suitable for very large trees)
+    print("=" * 80)
+    print("Streamed Tree (max depth 2, at most 3 children per directory)")
+    print("=" * 80)
+    TreeVisualizer.write_tree(root, max_depth=2, max_children=3)
+    print()
+    
     # Summary
     print("=" * 80)
     print("TREE STATISTICS")
@@ -212,20 +342,9 @@ def main():
     print(f"Root has {len(root.children)} direct children")
     print()
     
-    # Show the hierarchical structure
-    def count_nodes(component):
-        if isinstance(component, File):
-            return 1, 0  # 1 file, 0 directories
-        else:
-            files = 0
-            dirs = 1  # Count this directory
-            for child in component.children:
-                f, d = count_nodes(child)
-                files += f
-                dirs += d
-            return files, dirs
-    
-    total_files, total_dirs = count_nodes(root)
+    # Directories keep their file/directory counts cached, so no walk is needed
+    total_files = root.get_file_count()
+    total_dirs = root.get_directory_count() + 1  # Count the root as well
     print(f"Total Files: {total_files}")
     print(f"Total Directories: {total_dirs}")
     print(f"Total Nodes: {total_files + total_dirs}")
@@ -0,0 +1,343 @@
+"""
+TreeWatcher - Keeps a scanned Composite Pattern tree in step with the disk
+Detects changed directories by comparing their mtimes and rescans only
+those listings, patching Directory/File nodes in place.
+
+Every patch goes through the normal Directory/File API (add, remove,
+File.size), so size deltas flow up the ancestors' cached rollups and any
+PathIndex or TreeObserver on the tree sees the changes too.
+
+Polling needs nothing beyond os.stat. A directory's mtime changes when
+entries are created, deleted or renamed in it, but not when an existing
+file is rewritten in place; such size changes are picked up the next time
+that directory's listing changes. On Linux the optional inotify fast path
+(use_inotify=True, via ctypes) replaces most of the stat calls and also
+reports in-place file writes. Directories that cannot get a watch, for
+example because fs.inotify.max_user_watches is exhausted, stay on polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from file import File
+from directory import Directory
+from disk_scanner import DiskScanner
+
+
+@dataclass
+class ChangeEvent:
+    """One patch applied to the tree"""
+    kind: str         # TreeWatcher.ADDED, REMOVED or RESIZED
+    path: str         # Relative to the watched root, '/'-separated
+    size_delta: int   # Change in total size caused by this event
+
+
+class _Inotify:
+    """Minimal ctypes binding to the Linux inotify API"""
+
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    FILE_WRITTEN = IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB
+    LISTING_CHANGED = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+    MASK = FILE_WRITTEN | LISTING_CHANGED | IN_DELETE_SELF | IN_MOVE_SELF
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path: str) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK | self.IN_ONLYDIR)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def remove_watch(self, wd: int) -> None:
+        self._libc.inotify_rm_watch(self.fd, wd)  # Fails harmlessly if already gone
+
+    def read_events(self) -> List[Tuple[int, int, str]]:
+        """Drain pending events as (wd, mask, name) without blocking"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+                offset += self.EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class TreeWatcher:
+    """Scans a path once, then patches the tree as the disk changes"""
+
+    ADDED = "added"
+    REMOVED = "removed"
+    RESIZED = "resized"
+
+    def __init__(self, path: str, scanner: Optional[DiskScanner] = None,
+                 on_change: Optional[Callable[[ChangeEvent], None]] = None,
+                 use_inotify: bool = False):
+        """
+        path:        directory to scan and watch
+        scanner:     DiskScanner whose options (workers, symlinks, depth,
+                     excludes) are used for the initial scan and rescans
+        on_change:   called with each ChangeEvent after a poll patches the tree
+        use_inotify: use inotify where available, falling back to polling
+        """
+        self.path = os.path.abspath(path)
+        self.scanner = scanner or DiskScanner()
+        self.scanner.record_mtimes = True
+        self.on_change = on_change
+        self.root = self.scanner.scan(self.path)
+        self._mtimes: Dict[Directory, int] = dict(self.scanner.mtimes)
+
+        self._inotify: Optional[_Inotify] = None
+        self._watches: Dict[int, Directory] = {}
+        self._watch_of: Dict[Directory, int] = {}
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None  # Not Linux, or inotify unavailable: poll
+            else:
+                for directory in self._mtimes:
+                    self._watch(directory)
+
+    def close(self) -> None:
+        """Release the inotify descriptor, if any"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._watches.clear()
+            self._watch_of.clear()
+
+    def watch(self, interval: float = 60.0, stop: Optional[threading.Event] = None) -> None:
+        """Poll every `interval` seconds until `stop` is set"""
+        stop = stop or threading.Event()
+        while not stop.wait(interval):
+            self.poll()
+
+    def poll(self) -> List[ChangeEvent]:
+        """Find changed directories, patch the tree and return the events"""
+        dirty = set()
+        written: List[Tuple[Directory, str]] = []
+        poll_all = self._inotify is None
+        if self._inotify is not None:
+            for wd, mask, name in self._inotify.read_events():
+                if mask & _Inotify.IN_Q_OVERFLOW:
+                    poll_all = True
+                    continue
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & _Inotify.IN_IGNORED:
+                    del self._watches[wd]
+                    self._watch_of.pop(directory, None)
+                elif mask & _Inotify.LISTING_CHANGED:
+                    dirty.add(directory)
+                elif mask & _Inotify.FILE_WRITTEN and name and not mask & _Inotify.IN_ISDIR:
+                    written.append((directory, name))
+
+        for directory, mtime in list(self._mtimes.items()):
+            if not poll_all and directory in self._watch_of:
+                continue
+            try:
+                if os.stat(self._path_of(directory)[0]).st_mtime_ns != mtime:
+                    dirty.add(directory)
+            except FileNotFoundError:
+                pass  # Its parent's listing changed too and will remove it
+
+        events: List[ChangeEvent] = []
+        for directory in sorted(dirty, key=self._depth_of):
+            if directory in self._mtimes:  # Skip directories removed meanwhile
+                self._rescan(directory, events)
+        for directory, name in written:
+            if directory in self._mtimes and directory.has_child(name):
+                self._restat(directory, directory.get_child_by_name(name), events)
+
+        if self.on_change is not None:
+            for event in events:
+                self.on_change(event)
+        return events
+
+    def _rescan(self, directory: Directory, events: List[ChangeEvent]) -> None:
+        """Re-list one directory and patch its children to match"""
+        abs_path, rel_path = self._path_of(directory)
+        try:
+            mtime = os.stat(abs_path).st_mtime_ns
+            files, subdirs, errors = self.scanner._scan_listing(abs_path, rel_path)
+        except FileNotFoundError:
+            return
+        self._mtimes[directory] = mtime
+        self.scanner.errors.extend(errors)
+        listed_files = {node.name: node for node in files}
+        listed_dirs = {name: sub_path for name, sub_path, _, _ in subdirs}
+
+        for child in list(directory.children):
+            child_path = f"{rel_path}/{child.name}" if rel_path else child.name
+            if isinstance(child, Directory) and child.name in listed_dirs:
+                continue
+            if not isinstance(child, Directory) and child.name in listed_files:
+                new_size = listed_files[child.name].get_size()
+                if new_size != child.get_size():
+                    delta = new_size - child.get_size()
+                    child.size = new_size
+                    events.append(ChangeEvent(self.RESIZED, child_path, delta))
+                continue
+            if isinstance(child, Directory):
+                self._forget(child)
+            directory.remove(child)
+            events.append(ChangeEvent(self.REMOVED, child_path, -child.get_size()))
+
+        added = [node for name, node in listed_files.items() if not directory.has_child(name)]
+        directory.add_all(added)
+        for node in added:
+            path = f"{rel_path}/{node.name}" if rel_path else node.name
+            events.append(ChangeEvent(self.ADDED, path, node.get_size()))
+
+        for name, sub_path in listed_dirs.items():
+            if directory.has_child(name):
+                continue
+            subtree = self._scan_subtree(sub_path, self._depth_of(directory) + 1)
+            directory.add(subtree)
+            path = f"{rel_path}/{name}" if rel_path else name
+            events.append(ChangeEvent(self.ADDED, path, subtree.get_size()))
+
+    def _restat(self, directory: Directory, child, events: List[ChangeEvent]) -> None:
+        """Refresh one file's size after an inotify write event"""
+        if not isinstance(child, File):
+            return
+        abs_path, rel_path = self._path_of(directory)
+        follow = self.scanner.symlinks == DiskScanner.FOLLOW
+        try:
+            new_size = os.stat(os.path.join(abs_path, child.name), follow_symlinks=follow).st_size
+        except FileNotFoundError:
+            return
+        if new_size != child.get_size():
+            delta = new_size - child.get_size()
+            child.size = new_size
+            path = f"{rel_path}/{child.name}" if rel_path else child.name
+            events.append(ChangeEvent(self.RESIZED, path, delta))
+
+    def _scan_subtree(self, path: str, level: int) -> Directory:
+        """Scan a new directory found at `level` below the root"""
+        max_depth = self.scanner.max_depth
+        scanner = DiskScanner(max_workers=self.scanner.max_workers, symlinks=self.scanner.symlinks,
+                              max_depth=None if max_depth is None else max(0, max_depth - level),
+                              exclude=self.scanner.exclude, record_mtimes=True)
+        subtree = scanner.scan(path)
+        self.scanner.errors.extend(scanner.errors)
+        self._mtimes.update(scanner.mtimes)
+        if self._inotify is not None:
+            for directory in scanner.mtimes:
+                self._watch(directory, os.path.join(os.path.dirname(path), self._relative(directory, subtree)))
+        return subtree
+
+    def _watch(self, directory: Directory, abs_path: Optional[str] = None) -> None:
+        try:
+            wd = self._inotify.add_watch(abs_path or self._path_of(directory)[0])
+        except OSError:
+            return  # Out of watches or gone already: this directory is polled
+        self._watches[wd] = directory
+        self._watch_of[directory] = wd
+
+    def _forget(self, removed: Directory) -> None:
+        """Stop tracking every directory in a removed subtree"""
+        stack = [removed]
+        while stack:
+            directory = stack.pop()
+            self._mtimes.pop(directory, None)
+            wd = self._watch_of.pop(directory, None)
+            if wd is not None:
+                self._watches.pop(wd, None)
+                self._inotify.remove_watch(wd)
+            stack.extend(child for child in directory.children if isinstance(child, Directory))
+
+    @staticmethod
+    def _relative(directory: Directory, top: Directory) -> str:
+        """Path of `directory` from the parent of `top` (inclusive of top's name)"""
+        parts = []
+        node = directory
+        while node is not top:
+            parts.append(node.name)
+            node = node.parent
+        parts.append(top.name)
+        return os.path.join(*reversed(parts))
+
+    def _path_of(self, directory: Directory) -> Tuple[str, str]:
+        """(absolute path, path relative to the root) of a tracked directory"""
+        parts = []
+        node = directory
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        rel_path = "/".join(reversed(parts))
+        return (os.path.join(self.path, *reversed(parts)) if parts else self.path), rel_path
+
+    @staticmethod
+    def _depth_of(directory: Directory) -> int:
+        depth = 0
+        node = directory
+        while node.parent is not None:
+            depth += 1
+            node = node.parent
+        return depth
+
+
+def main():
+    """Watch a directory and print every change (Ctrl+C to stop)"""
+    path = sys.argv[1] if len(sys.argv) > 1 else "."
+    interval = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    def report(event: ChangeEvent) -> None:
+        print(f"{event.kind:8} {event.path}  ({event.size_delta:+,} bytes)")
+
+    watcher = TreeWatcher(path, on_change=report, use_inotify=True)
+    mode = "inotify + polling" if watcher._inotify is not None else "polling"
+    print(f"Watching {watcher.path} ({watcher.root.get_file_count():,} files, {mode})")
+    try:
+        while True:
+            time.sleep(interval)
+            if watcher.poll():
+                print(f"Total size now {watcher.root.get_size():,} bytes")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
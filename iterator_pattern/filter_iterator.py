@@ -1,28 +1,146 @@
 """
 FilterIterator - Concrete Iterator for Iterator Pattern
 Traverses only songs matching a filter condition.
+
+Filtering is lazy: each call to __next__ pulls songs from the source only
+until the next match, so nothing is copied and the first result does not
+wait for the whole playlist to be scanned. skip(), limit() and take()
+stop pulling as soon as they have what they need.
+
+Predicates combine with & (and), | (or) and ~ (not):
+
+    queen_epics = by_artist("Queen") & longer_than(300)
+    playlist.filter(queen_epics | ~by_artist("Eagles")).skip(1).limit(10)
 """
 
-from typing import List, Iterator, Callable
+import sys
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
 from song import Song
 
 
+class Predicate:
+    """A song test that composes with &, | and ~"""
+
+    def __init__(self, test: Callable[[Song], bool]):
+        self._test = test
+
+    def __call__(self, song: Song) -> bool:
+        return self._test(song)
+
+    def __and__(self, other: Callable[[Song], bool]) -> 'Predicate':
+        return Predicate(lambda song: self._test(song) and other(song))
+
+    def __or__(self, other: Callable[[Song], bool]) -> 'Predicate':
+        return Predicate(lambda song: self._test(song) or other(song))
+
+    def __invert__(self) -> 'Predicate':
+        return Predicate(lambda song: not self._test(song))
+
+
+def by_artist(artist: str) -> Predicate:
+    """Songs by exactly this artist"""
+    return Predicate(lambda song: song.artist == artist)
+
+
+def longer_than(seconds: int) -> Predicate:
+    """Songs lasting more than `seconds`"""
+    return Predicate(lambda song: song.duration > seconds)
+
+
+def shorter_than(seconds: int) -> Predicate:
+    """Songs lasting less than `seconds`"""
+    return Predicate(lambda song: song.duration < seconds)
+
+
+def title_contains(text: str) -> Predicate:
+    """Songs whose title contains `text`, ignoring case"""
+    text = text.lower()
+    return Predicate(lambda song: text in song.title.lower())
+
+
 class FilterIterator:
     """Iterator that only returns songs matching a filter condition"""
-    
-    def __init__(self, songs: List[Song], filter_func: Callable[[Song], bool]):
-        self._songs = [song for song in songs if filter_func(song)]
-        self._index = 0
-    
+
+    def __init__(self, songs: Iterable[Song], filter_func: Callable[[Song], bool]):
+        self._source = iter(songs)
+        self._filter = filter_func
+        self._to_skip = 0
+        self._remaining: Optional[int] = None
+        self.examined = 0  # Songs pulled from the source so far
+
     def __iter__(self) -> Iterator[Song]:
         """Returns the iterator object itself"""
         return self
-    
+
     def __next__(self) -> Song:
         """Returns the next song matching the filter"""
-        if self._index < len(self._songs):
-            song = self._songs[self._index]
-            self._index += 1
+        while self._remaining != 0:
+            song = next(self._source)  # StopIteration ends the filter too
+            self.examined += 1
+            if not self._filter(song):
+                continue
+            if self._to_skip:
+                self._to_skip -= 1
+                continue
+            if self._remaining is not None:
+                self._remaining -= 1
             return song
-        else:
-            raise StopIteration
+        raise StopIteration
+
+    def where(self, filter_func: Callable[[Song], bool]) -> 'FilterIterator':
+        """Also require `filter_func` for the songs still to come"""
+        current = self._filter
+        self._filter = lambda song: current(song) and filter_func(song)
+        return self
+
+    def skip(self, count: int) -> 'FilterIterator':
+        """Pass over the next `count` matches"""
+        self._to_skip += count
+        return self
+
+    def limit(self, count: int) -> 'FilterIterator':
+        """Stop after at most `count` more matches"""
+        self._remaining = count if self._remaining is None else min(self._remaining, count)
+        return self
+
+    def take(self, count: int) -> List[Song]:
+        """The next `count` matches (fewer if the songs run out)"""
+        songs = []
+        while len(songs) < count:
+            try:
+                songs.append(next(self))
+            except StopIteration:
+                break
+        return songs
+
+
+def main():
+    """Time the first 10 Queen songs from a large library, eager vs lazy"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    artists = [f"Artist {i}" for i in range(1000)]
+    # Queen appears once every 50,000 songs
+    library = [Song(f"Track {i}", "Queen" if i % 50_000 == 49_999 else artists[i % 1000], 120 + i % 300)
+               for i in range(n)]
+
+    print("=" * 70)
+    print(f"FILTER ITERATOR - FIRST 10 QUEEN SONGS OF {n:,}")
+    print("=" * 70)
+    is_queen = by_artist("Queen")
+
+    start = time.perf_counter()
+    eager = [song for song in library if is_queen(song)][:10]
+    eager_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lazy_iterator = FilterIterator(library, is_queen)
+    lazy = lazy_iterator.take(10)
+    lazy_time = time.perf_counter() - start
+
+    assert lazy == eager
+    print(f"   pre-materialized filter  {eager_time * 1e3:9.1f} ms   {n:,} songs examined")
+    print(f"   lazy FilterIterator      {lazy_time * 1e3:9.1f} ms   {lazy_iterator.examined:,} songs examined")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,16 @@ ForwardIterator - Concrete Iterator for Iterator Pattern
 Traverses the playlist from beginning to end.
 """
 
-from typing import List, Iterator
+from typing import Iterable, Iterator
 from song import Song
 
 
 class ForwardIterator:
     """Iterator that traverses the playlist from beginning to end"""
     
-    def __init__(self, songs: List[Song]):
-        self._songs = songs
-        self._index = 0
+    def __init__(self, songs: Iterable[Song]):
+        # Playlist passes a snapshot that no longer changes, so no copy is needed
+        self._songs = iter(songs)
     
     def __iter__(self) -> Iterator[Song]:
         """Returns the iterator object itself"""
@@ -20,9 +20,4 @@ class ForwardIterator:
     
     def __next__(self) -> Song:
         """Returns the next song in forward order"""
-        if self._index < len(self._songs):
-            song = self._songs[self._index]
-            self._index += 1
-            return song
-        else:
-            raise StopIteration
+        return next(self._songs)
@@ -5,6 +5,7 @@ Demonstrates custom iterators using Python's built-in iterator interface.
 
 from song import Song
 from playlist import Playlist
+from filter_iterator import by_artist, longer_than
 
 
 def main():
@@ -63,6 +64,16 @@ def main():
         print(f"   {i}. {song}")
     print()
     
+    # Demonstration 4b: Composed predicates with early stopping
+    print("-" * 70)
+    print("4b. COMPOSED FILTER (Queen or over 6 minutes, skip 1, limit 2):")
+    print("-" * 70)
+    composed = my_playlist.filter(by_artist("Queen") | longer_than(360)).skip(1).limit(2)
+    for i, song in enumerate(composed, 1):
+        print(f"   {i}. {song}")
+    print(f"   Songs examined: {composed.examined} of {my_playlist.get_song_count()}")
+    print()
+    
     # Demonstration 5: Using iterator with list comprehension
     print("-" * 70)
     print("5. USING ITERATOR IN LIST COMPREHENSION:")
@@ -85,6 +96,19 @@ def main():
     print(f"   Iterator 2 - Second song: {next(iter2).title}")
     print()
     
+    # Demonstration 7: Removing songs while an iteration is running
+    print("-" * 70)
+    print("7. REMOVING SONGS DURING ITERATION (snapshot iterators):")
+    print("-" * 70)
+    handle = my_playlist.add_song(Song("Radio Ga Ga", "Queen", 343))
+    for i, song in enumerate(my_playlist, 1):
+        if i == 1:
+            my_playlist.remove(handle)
+            my_playlist.remove_song(song)
+        print(f"   {i}. {song}")
+    print(f"   Songs left after the loop: {my_playlist.get_song_count()}")
+    print()
+    
     print("=" * 70)
     print("PATTERN BENEFITS DEMONSTRATED:")
     print("-" * 70)
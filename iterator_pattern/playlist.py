@@ -1,14 +1,26 @@
 """
 Playlist - Aggregate class for Iterator Pattern
 A playlist collection that supports multiple iteration strategies.
+
+Songs are stored in an insertion-ordered dict keyed by the handle that
+add_song returns, so remove(handle) is O(1). Iterators traverse a
+copy-on-write snapshot: creating one marks the dict as shared, and the
+next mutation copies it before changing anything. An iteration therefore
+never copies up front, and songs added or removed meanwhile neither skip
+nor tear it; it sees the playlist as it was when it started.
+
+enable_indexes() adds secondary indexes (see song_index.py), keyed by
+handle, that add_song/remove keep current; the artist, title-prefix and
+duration queries use them when present and scan the songs otherwise.
 """
 
-from typing import List, Iterator
+from typing import Callable, Dict, List, Iterator, Optional, Tuple
 from song import Song
 from forward_iterator import ForwardIterator
 from reverse_iterator import ReverseIterator
 from shuffle_iterator import ShuffleIterator
-from filter_iterator import FilterIterator
+from filter_iterator import FilterIterator, by_artist
+from song_index import INDEX_TYPES
 
 
 class Playlist:
@@ -19,15 +31,117 @@ class Playlist:
     
     def __init__(self, name: str):
         self.name = name
-        self._songs: List[Song] = []
+        self._songs: Dict[int, Song] = {}  # handle -> song, in playlist order
+        self._handles: Dict[int, int] = {}  # id(song) -> handle of its earliest live copy
+        self._later_handles: Dict[int, List[int]] = {}  # id(song) -> other copies, for songs added twice
+        # Handles in playlist order, including removed ones until they outnumber
+        # the live songs; shuffles permute positions in this list
+        self._order: List[int] = []
+        self._next_handle = 0
+        self._shared = False  # whether an iterator may still be reading _songs
+        self._indexes: Dict[str, object] = {}
+    
+    def add_song(self, song: Song) -> int:
+        """Add a song to the playlist; returns a handle for remove()"""
+        handle = self._next_handle
+        self._next_handle += 1
+        self._writable()[handle] = song
+        self._order.append(handle)
+        if id(song) in self._handles:
+            self._later_handles.setdefault(id(song), []).append(handle)
+        else:
+            self._handles[id(song)] = handle
+        for index in self._indexes.values():
+            index.add(handle, song)
+        return handle
     
-    def add_song(self, song: Song) -> None:
-        """Add a song to the playlist"""
-        self._songs.append(song)
+    def remove(self, handle: int) -> Song:
+        """Remove the song added under `handle` in O(1); raises KeyError if it is gone"""
+        song = self._songs[handle]
+        # Indexes first: if one fails, the song is still in the playlist
+        for index in self._indexes.values():
+            index.remove(handle, song)
+        del self._writable()[handle]
+        self._forget_handle(id(song), handle)
+        if len(self._order) > 2 * len(self._songs):
+            # A new list: shuffles already running keep the old one
+            self._order = list(self._songs)
+        return song
+    
+    def _forget_handle(self, key: int, handle: int) -> None:
+        """Drop `handle` from the copies of the song whose id is `key`"""
+        later = self._later_handles.get(key)
+        if self._handles[key] == handle:
+            if later:
+                self._handles[key] = later.pop(0)
+            else:
+                del self._handles[key]
+        elif later:
+            later.remove(handle)
+        if later is not None and not later:
+            del self._later_handles[key]
     
     def remove_song(self, song: Song) -> None:
-        """Remove a song from the playlist"""
-        self._songs.remove(song)
+        """
+        Remove a song from the playlist
+
+        Removes the earliest copy of this very object in O(1), like
+        list.remove for a song added more than once. Only if the object is
+        not in the playlist is it scanned for the first equal song.
+        """
+        handle = self._handles.get(id(song))
+        if handle is None or self._songs.get(handle) is not song:
+            handle = next((handle for handle, other in self._songs.items() if other == song), None)
+            if handle is None:
+                raise ValueError(f"{song} is not in the playlist")
+        self.remove(handle)
+    
+    def get_song(self, handle: int) -> Song:
+        """The song added under `handle`; raises KeyError if it was removed"""
+        return self._songs[handle]
+    
+    def _writable(self) -> Dict[int, Song]:
+        """The song dict, copied first if an iterator may be reading it"""
+        if self._shared:
+            self._songs = dict(self._songs)
+            self._shared = False
+        return self._songs
+    
+    def _snapshot(self) -> Dict[int, Song]:
+        """The song dict, which stays unchanged from now on (copy-on-write)"""
+        self._shared = True
+        return self._songs
+    
+    def enable_indexes(self, *names: str) -> None:
+        """Build and maintain the named indexes: "artist", "title", "duration" """
+        for name in names:
+            if name not in INDEX_TYPES:
+                raise ValueError(f"Unknown index {name!r}; choose from {sorted(INDEX_TYPES)}")
+            if name not in self._indexes:
+                index = INDEX_TYPES[name]()
+                index.add_all(self._songs.items())
+                self._indexes[name] = index
+    
+    def songs_by_artist(self, artist: str) -> List[Song]:
+        """Songs by `artist`: O(k) with the artist index"""
+        if "artist" in self._indexes:
+            return self._indexes["artist"].songs(artist)
+        return [song for song in self._songs.values() if song.artist == artist]
+    
+    def songs_with_title_prefix(self, prefix: str) -> List[Song]:
+        """Songs whose title starts with `prefix` (ignoring case), in title order"""
+        if "title" in self._indexes:
+            return self._indexes["title"].prefix(prefix)
+        prefix = prefix.casefold()
+        matches = [song for song in self._songs.values() if song.title.casefold().startswith(prefix)]
+        return sorted(matches, key=lambda song: song.title.casefold())
+    
+    def songs_by_duration(self, shortest: int, longest: int) -> List[Song]:
+        """Songs lasting `shortest` to `longest` seconds, shortest first: O(log n + k) indexed"""
+        if "duration" in self._indexes:
+            return self._indexes["duration"].between(shortest, longest)
+        matches = [song for song in self._songs.values() if shortest <= song.duration <= longest]
+        return sorted(matches, key=lambda song: song.duration)
     
     def get_song_count(self) -> int:
         """Get the number of songs in the playlist"""
@@ -39,17 +153,32 @@ class Playlist:
         Returns the default iterator (forward).
         This is the built-in Python iterator interface.
         """
-        return ForwardIterator(self._songs)
+        return ForwardIterator(self._snapshot().values())
     
     # Alternative iteration strategies
     def reverse_iterator(self) -> Iterator[Song]:
         """Returns an iterator that traverses songs in reverse order"""
-        return ReverseIterator(self._songs)
+        return ReverseIterator(self._snapshot().values())
+    
+    def shuffle_iterator(self, seed: Optional[int] = None,
+                         cursor: Optional[Tuple[int, int, int, int]] = None) -> ShuffleIterator:
+        """
+        Returns a lazy iterator that traverses songs in random order
+
+        The same seed repeats the order, and a saved `cursor` resumes it:
+        removed songs are skipped, and songs added since the cursor was
+        saved come after the rest of the original order. Once removed
+        songs outnumber the live ones the positions are renumbered, and a
+        cursor saved before that may then repeat or skip songs.
+        """
+        return ShuffleIterator(self._snapshot(), seed=seed, cursor=cursor, order=self._order)
     
-    def shuffle_iterator(self) -> Iterator[Song]:
-        """Returns an iterator that traverses songs in random order"""
-        return ShuffleIterator(self._songs)
+    def filter(self, predicate: Callable[[Song], bool]) -> FilterIterator:
+        """Returns a lazy iterator for songs matching the predicate"""
+        return FilterIterator(self._snapshot().values(), predicate)
     
-    def filter_by_artist(self, artist: str) -> Iterator[Song]:
-        """Returns an iterator for songs by a specific artist"""
-        return FilterIterator(self._songs, lambda song: song.artist == artist)
+    def filter_by_artist(self, artist: str) -> FilterIterator:
+        """Returns a lazy iterator for songs by a specific artist"""
+        if "artist" in self._indexes:
+            return FilterIterator(self._indexes["artist"].songs(artist), by_artist(artist))
+        return FilterIterator(self._snapshot().values(), by_artist(artist))
@@ -1,30 +1,175 @@
 """
 ShuffleIterator - Concrete Iterator for Iterator Pattern
 Traverses the playlist in random order.
+
+The order is a keyed pseudo-random permutation of the song positions
+(a Feistel network over the next power-of-four domain), evaluated one
+position at a time. Nothing is copied or shuffled up front and no index
+array is stored: the first song is ready in O(1), each next song costs
+O(1) amortized (positions outside the playlist are skipped, at most 3
+for every 4 evaluated), and the whole state is four integers.
+
+The same seed gives the same order. `cursor` captures (seed, block start,
+block length, position), and ShuffleIterator(songs, cursor=saved) resumes
+right after the last song returned:
+
+    shuffle = ShuffleIterator(songs, seed=42)
+    first = next(shuffle)
+    saved = shuffle.cursor
+    ShuffleIterator(songs, cursor=saved)   # continues with the second song
+
+Positions are shuffled in blocks. The first block is every position
+there was when the shuffle started; once a block is used up, positions
+added after it began form the next one. So a shuffle resumed after songs
+were appended plays the rest of the original songs, then the new ones.
 """
 
-from typing import List, Iterator
 import random
+import sys
+import time
+from typing import Iterator, Mapping, Optional, Sequence, Tuple, Union
 from song import Song
 
+_MASK64 = (1 << 64) - 1
+_ROUNDS = 6
+
+
+def _mix(x: int) -> int:
+    """64-bit finalizer from MurmurHash3: every input bit affects every output bit"""
+    x = ((x ^ (x >> 33)) * 0xFF51AFD7ED558CCD) & _MASK64
+    x = ((x ^ (x >> 33)) * 0xC4CEB9FE1A85EC53) & _MASK64
+    return x ^ (x >> 33)
+
 
 class ShuffleIterator:
     """Iterator that traverses the playlist in random order"""
-    
-    def __init__(self, songs: List[Song]):
-        self._songs = songs.copy()  # Don't modify original
-        random.shuffle(self._songs)
-        self._index = 0
-    
+
+    def __init__(self, songs: Union[Sequence[Song], Mapping[int, Song]],
+                 seed: Optional[int] = None, cursor: Optional[Tuple[int, int, int, int]] = None,
+                 order: Optional[Sequence[int]] = None):
+        """
+        songs:  a sequence, or a mapping from key to song
+        seed:   fixes the order; a random seed is chosen if None
+        cursor: a saved `cursor` to resume from (overrides seed)
+        order:  for a mapping, the keys to shuffle (default: all of them, listed
+                up front); keys missing from the mapping are skipped, e.g. the
+                handles of removed playlist songs
+        """
+        if isinstance(songs, Mapping):
+            if order is None:
+                order = list(songs)
+            lookup = songs.get
+            self._lookup = lambda position: lookup(order[position])
+            self._size = len(order)
+        else:
+            self._lookup = songs.__getitem__
+            self._size = len(songs)
+
+        if cursor is not None:
+            seed, start, length, position = cursor
+        else:
+            if seed is None:
+                seed = random.getrandbits(64)
+            start, length, position = 0, self._size, 0
+        self.seed = seed
+        self._begin_block(start, length)
+        self._position = position
+
+    @property
+    def cursor(self) -> Tuple[int, int, int, int]:
+        """(seed, block start, block length, position): pass back as `cursor` to resume"""
+        return (self.seed, self._start, self._length, self._position)
+
     def __iter__(self) -> Iterator[Song]:
         """Returns the iterator object itself"""
         return self
-    
+
     def __next__(self) -> Song:
         """Returns the next song in shuffled order"""
-        if self._index < len(self._songs):
-            song = self._songs[self._index]
-            self._index += 1
-            return song
-        else:
-            raise StopIteration
+        while True:
+            domain = 1 << (2 * self._half)
+            # A resumed block may reach past fewer songs than it was keyed for
+            limit = min(self._length, self._size - self._start)
+            while self._position < domain:
+                index = self._permute(self._position)
+                self._position += 1
+                if index < limit:
+                    song = self._lookup(self._start + index)
+                    if song is not None:
+                        return song
+            if self._start + self._length >= self._size:
+                raise StopIteration
+            # Block used up: shuffle the positions added since it began
+            self._begin_block(self._start + self._length, self._size - self._start - self._length)
+            self._position = 0
+
+    def _begin_block(self, start: int, length: int) -> None:
+        """Key a permutation of positions start .. start+length-1"""
+        # Smallest even bit count whose domain holds the block
+        bits = max(1, (length - 1).bit_length())
+        bits += bits % 2
+        self._start = start
+        self._length = length
+        self._half = bits // 2
+        self._half_mask = (1 << self._half) - 1
+        block_seed = self.seed + start * 0xD6E8FEB86659FD93
+        self._round_keys = [_mix((block_seed + i * 0x9E3779B97F4A7C15) & _MASK64)
+                            for i in range(_ROUNDS)]
+
+    def _permute(self, position: int) -> int:
+        """Balanced Feistel network: a bijection on 0 .. 2**bits - 1"""
+        half, mask = self._half, self._half_mask
+        left, right = position >> half, position & mask
+        for key in self._round_keys:
+            left, right = right, left ^ (_mix(right ^ key) & mask)
+        return (left << half) | right
+
+
+def main():
+    """Time to the first songs of a shuffled 10M-track library, eager vs lazy"""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    tracks = [Song(f"Track {i}", f"Artist {i % 100}", 120 + i % 300) for i in range(1000)]
+    library = [tracks[i % 1000] for i in range(n)]
+
+    print("=" * 70)
+    print(f"SHUFFLE ITERATOR - FIRST 10 SONGS OF {n:,}")
+    print("=" * 70)
+    start = time.perf_counter()
+    eager = library.copy()
+    random.shuffle(eager)
+    eager_time = time.perf_counter() - start
+    del eager
+
+    start = time.perf_counter()
+    shuffle = ShuffleIterator(library, seed=7)
+    first = [next(shuffle) for _ in range(10)]
+    lazy_time = time.perf_counter() - start
+
+    saved = shuffle.cursor
+    following = [next(shuffle) for _ in range(5)]
+    resumed = ShuffleIterator(library, cursor=saved)
+    assert [next(resumed) for _ in range(5)] == following
+    assert next(ShuffleIterator(library, seed=7)) is first[0]
+
+    # Resume after songs were appended: the rest of the old order, then the new songs
+    album = tracks[:20]
+    partial = ShuffleIterator(album, seed=3)
+    played = [next(partial) for _ in range(8)]
+    grown = album + [Song(f"Bonus {i}", "Artist 0", 200) for i in range(3)]
+    rest = list(ShuffleIterator(grown, cursor=partial.cursor))
+    assert sorted(map(id, played + rest)) == sorted(map(id, grown))
+    assert {song.title for song in rest[-3:]} == {"Bonus 0", "Bonus 1", "Bonus 2"}
+
+    start = time.perf_counter()
+    count = sum(1 for _ in zip(range(100_000), shuffle))
+    per_song = (time.perf_counter() - start) / count
+
+    print(f"   copy + random.shuffle     {eager_time * 1e3:10.1f} ms   (plus a second {n:,}-entry list)")
+    print(f"   lazy ShuffleIterator      {lazy_time * 1e3:10.3f} ms   (state: 4 integers)")
+    print(f"   lazy, per further song    {per_song * 1e6:10.1f} µs")
+    print(f"   resumed from cursor {saved} with the same songs")
+    print(f"   resumed a 20-song shuffle after 3 songs were added: {len(rest)} more, bonus tracks last")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Song Indexes - Secondary indexes for Playlist queries
+Answer artist, title-prefix and duration-range queries without scanning
+every song.
+
+- ArtistIndex:   artist -> songs, O(1) to maintain, O(k) to query
+- TitleIndex:    songs sorted by case-folded title, O(log n + k) prefix queries
+- DurationIndex: songs sorted by duration, O(log n + k) range queries
+
+Playlist.enable_indexes() builds them and add_song/remove keep them
+current. Entries are keyed by the playlist handle, so a song added twice
+is indexed twice and removing one copy leaves the other. A song's fields
+must not be changed while it is in an indexed playlist.
+
+The sorted indexes buffer new songs and merge them on the next query or
+removal, so a run of add_song calls costs O(1) each and one sort pays
+for the batch. Songs with equal keys come back in handle (insertion) order.
+
+Usage: python song_index.py [songs] [queries]
+"""
+
+import bisect
+import math
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from song import Song
+
+
+class ArtistIndex:
+    """Hash index from artist to that artist's songs, in insertion order"""
+
+    def __init__(self):
+        # Inner dicts map playlist handle -> song, in insertion order
+        self._by_artist: Dict[str, Dict[int, Song]] = {}
+
+    def add(self, handle: int, song: Song) -> None:
+        self._by_artist.setdefault(song.artist, {})[handle] = song
+
+    def add_all(self, entries: Iterable[Tuple[int, Song]]) -> None:
+        for handle, song in entries:
+            self.add(handle, song)
+
+    def remove(self, handle: int, song: Song) -> None:
+        songs = self._by_artist[song.artist]
+        del songs[handle]
+        if not songs:
+            del self._by_artist[song.artist]
+
+    def songs(self, artist: str) -> List[Song]:
+        """Songs by `artist` in O(k)"""
+        return list(self._by_artist.get(artist, {}).values())
+
+    def artists(self) -> List[str]:
+        return list(self._by_artist)
+
+
+class SortedIndex:
+    """Songs ordered by key(song), with O(log n + k) range queries"""
+
+    def __init__(self, key: Callable[[Song], Any]):
+        self._key = key
+        # (key, handle, song): the unique, increasing playlist handle breaks
+        # ties, so Songs themselves are never compared
+        self._entries: List[Tuple[Any, int, Song]] = []
+        self._pending: List[Tuple[Any, int, Song]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._pending)
+
+    def add(self, handle: int, song: Song) -> None:
+        self._pending.append((self._key(song), handle, song))
+
+    def add_all(self, entries: Iterable[Tuple[int, Song]]) -> None:
+        for handle, song in entries:
+            self.add(handle, song)
+        self._merge()
+
+    def remove(self, handle: int, song: Song) -> None:
+        self._merge()
+        position = bisect.bisect_left(self._entries, (self._key(song), handle))
+        if position == len(self._entries) or self._entries[position][1] != handle:
+            raise KeyError(handle)
+        del self._entries[position]
+
+    def range(self, lo: Any, hi: Any, inclusive: bool = True) -> List[Song]:
+        """Songs with lo <= key <= hi (key < hi when not inclusive), in key order"""
+        self._merge()
+        start = bisect.bisect_left(self._entries, (lo,))
+        if inclusive:
+            # Past every (hi, handle, song) entry
+            end = bisect.bisect_left(self._entries, (hi, math.inf))
+        else:
+            end = bisect.bisect_left(self._entries, (hi,))
+        return [song for _, _, song in self._entries[start:end]]
+
+    def _merge(self) -> None:
+        """Fold buffered songs into the sorted entries"""
+        if self._pending:
+            self._pending.sort()
+            if len(self._pending) < 64:
+                for entry in self._pending:
+                    bisect.insort(self._entries, entry)
+            else:
+                # Timsort merges the two sorted runs in linear time
+                self._entries.extend(self._pending)
+                self._entries.sort()
+            self._pending = []
+
+
+class TitleIndex(SortedIndex):
+    """Songs sorted by case-folded title"""
+
+    def __init__(self):
+        super().__init__(lambda song: song.title.casefold())
+
+    def prefix(self, text: str) -> List[Song]:
+        """Songs whose title starts with `text`, ignoring case, in title order"""
+        text = text.casefold()
+        return self.range(text, text + "\U0010ffff", inclusive=False)
+
+
+class DurationIndex(SortedIndex):
+    """Songs sorted by duration"""
+
+    def __init__(self):
+        super().__init__(lambda song: song.duration)
+
+    def between(self, shortest: int, longest: int) -> List[Song]:
+        """Songs lasting from `shortest` to `longest` seconds, shortest first"""
+        return self.range(shortest, longest)
+
+
+INDEX_TYPES = {
+    "artist": ArtistIndex,
+    "title": TitleIndex,
+    "duration": DurationIndex,
+}
+
+
+def main():
+    """Compare indexed playlist queries with full scans"""
+    from playlist import Playlist
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    rng = random.Random(11)
+    artists = [f"Artist {i:04d}" for i in range(5000)]
+    words = ["love", "night", "road", "fire", "heart", "rain", "dream", "gold", "river", "star"]
+
+    playlist = Playlist("Catalog")
+    for i in range(n):
+        title = f"{rng.choice(words).title()} {rng.choice(words)} {i}"
+        playlist.add_song(Song(title, rng.choice(artists), rng.randrange(60, 600)))
+
+    print("=" * 70)
+    print(f"PLAYLIST INDEXES - {n:,} SONGS")
+    print("=" * 70)
+    start = time.perf_counter()
+    playlist.enable_indexes("artist", "title", "duration")
+    print(f"   build all indexes   {time.perf_counter() - start:8.2f} s")
+    print()
+
+    cases = [
+        ("artist", lambda: rng.choice(artists),
+         lambda artist: playlist.songs_by_artist(artist),
+         lambda artist: [song for song in playlist if song.artist == artist]),
+        ("title prefix", lambda: f"{rng.choice(words)} {rng.choice(words)} 12",
+         lambda text: playlist.songs_with_title_prefix(text),
+         lambda text: sorted((song for song in playlist if song.title.casefold().startswith(text)),
+                             key=lambda song: song.title.casefold())),
+        ("duration range", lambda: rng.randrange(60, 600),
+         lambda lo: playlist.songs_by_duration(lo, lo + 1),
+         lambda lo: sorted((song for song in playlist if lo <= song.duration <= lo + 1),
+                           key=lambda song: song.duration)),
+    ]
+    print(f"   {'query':16} {'indexed/s':>12} {'scan/s':>10} {'avg results':>12}")
+    for name, make_argument, indexed, scan in cases:
+        arguments = [make_argument() for _ in range(queries)]
+        start = time.perf_counter()
+        results = sum(len(indexed(argument)) for argument in arguments)
+        indexed_rate = queries / (time.perf_counter() - start)
+        scans = arguments[:3]
+        start = time.perf_counter()
+        for argument in scans:
+            assert [id(song) for song in scan(argument)] == [id(song) for song in indexed(argument)]
+        scan_rate = len(scans) / (time.perf_counter() - start)
+        print(f"   {name:16} {indexed_rate:12,.0f} {scan_rate:10,.1f} {results / queries:12,.1f}")
+
+
+if __name__ == "__main__":
+    main()